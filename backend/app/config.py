@@ -0,0 +1,54 @@
+"""
+Configuration Module
+Storage locations shared by the web app and the background workers.
+
+By default everything lives next to the app package. Setting
+MOVIE_SHORTS_STORAGE points uploads, cuts, subtitles and analysis
+artifacts (and the job queue database) at shared storage, so several web
+nodes and workers see the same files.
+"""
+
+import os
+from pathlib import Path
+
+STORAGE_ROOT = Path(os.getenv('MOVIE_SHORTS_STORAGE', Path(__file__).parent))
+
+# Whisper model for final transcripts, and the much faster one used for
+# preview transcripts while the final one is being made
+WHISPER_MODEL = os.getenv('MOVIE_SHORTS_WHISPER_MODEL', 'small')
+PREVIEW_MODEL = os.getenv('MOVIE_SHORTS_PREVIEW_MODEL', 'tiny')
+
+# Memory, in MB, that transcriptions and encodes may reserve per process;
+# unset means half of what is available (see utils/memory_budget.py)
+MEMORY_LIMIT_MB = int(os.getenv('MOVIE_SHORTS_MEMORY_LIMIT_MB', 0)) or None
+
+
+def storage_folders(root=None):
+    """Get the storage folders as Flask config keys, creating them if needed"""
+    root = Path(root) if root else STORAGE_ROOT
+    folders = {
+        'UPLOAD_FOLDER': root / 'uploads',
+        'CUTS_FOLDER': root / 'cuts',
+        'SUBTITLES_FOLDER': root / 'subtitles',
+        'ANALYSIS_FOLDER': root / 'analysis',
+    }
+    for folder in folders.values():
+        folder.mkdir(parents=True, exist_ok=True)
+    return folders
+
+
+def queue_path(root=None):
+    """Get the path of the SQLite job queue database"""
+    default = (Path(root) if root else STORAGE_ROOT) / 'queue.sqlite3'
+    return Path(os.getenv('MOVIE_SHORTS_QUEUE_DB', default))
+
+
+def in_process_worker_kinds():
+    """
+    Get the job kinds the web process runs itself, in a background thread,
+    so single-process deployments still work through their queue. Set
+    MOVIE_SHORTS_INPROCESS_WORKER to an empty value when separate workers
+    (worker.py) handle every job.
+    """
+    value = os.getenv('MOVIE_SHORTS_INPROCESS_WORKER', 'transcribe,boundaries')
+    return [kind.strip() for kind in value.split(',') if kind.strip()]
@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
 import logging
 import traceback
-from ..services.analysis_service import AnalysisService
+from ..services.analysis_service import get_analysis_service
+from ..services.media_service import get_media_service
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -9,16 +10,27 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 analysis_bp = Blueprint('analysis', __name__)
 
-# Initialize services
-analysis_service = AnalysisService()
-
 @analysis_bp.route('/analyze-subtitles', methods=['POST'])
 def analyze_subtitles():
     try:
         data = request.json
         subtitles = data.get('subtitles', [])
         
+        analysis_service = get_analysis_service()
         sections = analysis_service.analyze_subtitles(subtitles)
+        
+        # Snap suggested edges to natural cut points unless disabled
+        if data.get('refine', True):
+            media_service = get_media_service()
+            filepath = None
+            if data.get('filename'):
+                try:
+                    filepath = media_service.find_upload(data['filename'])
+                except FileNotFoundError:
+                    pass
+            sections = analysis_service.refine_sections(
+                sections, subtitles, filepath, media_service.analysis_folder)
+        
         return jsonify({"sections": sections})
             
     except ValueError as e:
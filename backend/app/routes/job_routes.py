@@ -0,0 +1,70 @@
+"""
+Job Routes Module
+Queues media jobs for the background workers and reports their status.
+"""
+
+from flask import Blueprint, request, jsonify
+import logging
+from ..services.job_queue import JOB_KINDS
+from ..services.media_service import get_media_service
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+job_bp = Blueprint('jobs', __name__)
+
+def get_job_queue():
+    """Return the app's JobQueue, owned by its MediaService."""
+    return get_media_service().queue
+
+@job_bp.route('', methods=['POST'])
+def create_job():
+    """
+    Queue a job. Body: {"kind": "transcribe" | "cut" | "render" | "boundaries", "payload": {...}}
+    where the payload names an uploaded video in `filename`; cut jobs also
+    take startTime/endTime, render jobs a list of {start, end} `sections`
+    and transcribe jobs optional transcription `options`.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        kind = data.get('kind')
+        payload = data.get('payload') or {}
+        if not isinstance(payload, dict):
+            return jsonify({'error': 'Job payload must be a JSON object'}), 400
+
+        if kind not in JOB_KINDS:
+            return jsonify({'error': f"Job kind must be one of: {', '.join(JOB_KINDS)}"}), 400
+
+        try:
+            get_media_service().find_upload(payload.get('filename'))
+        except FileNotFoundError as e:
+            return jsonify({'error': str(e)}), 404
+
+        job_id = get_job_queue().enqueue(kind, payload)
+        return jsonify({'job_id': job_id, 'status': 'queued'}), 202
+    except Exception as e:
+        logger.error(f"Error queueing job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@job_bp.route('/<job_id>')
+def get_job(job_id):
+    """Get the status, and once done the result, of a queued job."""
+    try:
+        job = get_job_queue().get(job_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+
+        return jsonify({
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'attempts': job['attempts'],
+            'result': job['result'],
+            'error': job['error']
+        }), 200
+    except Exception as e:
+        logger.error(f"Error reading job: {str(e)}")
+        return jsonify({'error': str(e)}), 500
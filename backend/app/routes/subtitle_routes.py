@@ -5,22 +5,16 @@ Handles all subtitle-related endpoints including extraction, checking, and retri
 
 from flask import Blueprint, request, jsonify, send_from_directory
 import os
-from pathlib import Path
 import logging
-from werkzeug.utils import secure_filename
-from ..services.subtitle_service import SubtitleService
-from ..utils.video_utils import check_subtitles, allowed_file
+from ..services.media_service import get_media_service
+from ..services.subtitle_service import TranscriptionOptions
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 subtitle_bp = Blueprint('subtitles', __name__)
 
-# Initialize services
-subtitle_service = SubtitleService()
-
 @subtitle_bp.route('/check/<filename>')
 def check_video_subtitles(filename):
     """
@@ -28,60 +22,108 @@ def check_video_subtitles(filename):
     Returns a boolean indicating subtitle availability.
     """
     try:
-        filepath = os.path.join('uploads', filename)
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'Video file not found'}), 404
-        
-        has_subtitles = check_subtitles(filepath)
+        has_subtitles = get_media_service().check_subtitles(filename)
         return jsonify({
             'has_subtitles': has_subtitles
         }), 200
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
     except Exception as e:
         logger.error(f"Error checking subtitles: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @subtitle_bp.route('/extract/<filename>')
 def get_subtitles(filename):
+    """
+    Download subtitles as SRT: the embedded track (optionally picked with
+    `language`) or, if there is none, a Whisper transcript.
+    """
     try:
-        filepath = os.path.join('uploads', filename)
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'Video file not found'}), 404
-        
-        # First try to extract embedded subtitles
-        subtitle_path = subtitle_service.extract_subtitles(filepath, filename)
-        
-        # If no embedded subtitles found, use Whisper to generate them
-        if not subtitle_path:
-            logger.info("No embedded subtitles found, using Whisper to generate subtitles")
-            subtitle_path = os.path.join('subtitles', f"{os.path.splitext(filename)[0]}_whisper.srt")
-            if subtitle_service.transcribe_with_whisper(filepath, subtitle_path):
-                return send_from_directory(
-                    'subtitles',
-                    os.path.basename(subtitle_path),
-                    as_attachment=True
-                )
-            else:
-                return jsonify({'error': 'Failed to generate subtitles'}), 500
-        
+        media_service = get_media_service()
+        options = TranscriptionOptions.from_args(request.args)
+        subtitle_path = media_service.subtitle_file(filename, request.args.get('language'), options)
+
         return send_from_directory(
-            'subtitles',
+            media_service.subtitles_folder,
             os.path.basename(subtitle_path),
             as_attachment=True
         )
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': f'Invalid transcription options: {str(e)}'}), 400
     except Exception as e:
         logger.error(f"Error extracting subtitles: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
 @subtitle_bp.route('/get/<filename>')
 def get_subtitles_json(filename):
+    """
+    Get subtitles as JSON. With `preview=1`, a video without a finished
+    transcript gets a fast preview transcript right away plus a
+    `refine_job_id`; once GET /api/jobs/<refine_job_id> reports done,
+    fetching again returns the full-quality transcript.
+    """
     try:
-        filepath = os.path.join('uploads', filename)
-        if not os.path.exists(filepath):
-            return jsonify({'error': 'Video file not found'}), 404
-        
-        result = subtitle_service.get_subtitles_json(filepath, 'subtitles')
+        options = TranscriptionOptions.from_args(request.args)
+        preview = request.args.get('preview', '').lower() in TranscriptionOptions.TRUE_VALUES
+        result = get_media_service().subtitles_json(filename, request.args.get('language'), options, preview)
         return jsonify(result), 200
-            
+
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': f'Invalid transcription options: {str(e)}'}), 400
     except Exception as e:
         logger.error(f"Error extracting subtitles: {str(e)}")
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@subtitle_bp.route('/tracks/<filename>')
+def get_subtitle_tracks(filename):
+    """
+    Extract the embedded text subtitle tracks of a video in one pass.
+    An optional comma-separated `language` query parameter limits the
+    tracks to those languages.
+    """
+    try:
+        languages = request.args.get('language')
+        languages = [language.strip() for language in languages.split(',')] if languages else None
+        tracks = get_media_service().subtitle_tracks(filename, languages)
+        return jsonify({
+            'tracks': [
+                {
+                    'stream_index': track['stream_index'],
+                    'language': track['language'],
+                    'codec': track['codec'],
+                    'filename': os.path.basename(track['path'])
+                }
+                for track in tracks
+            ]
+        }), 200
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Error extracting subtitle tracks: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@subtitle_bp.route('/words/<filename>')
+def get_words(filename):
+    """
+    Get word-level timestamps for a time range of a transcribed video.
+    Optional `start` and `end` query parameters (seconds) bound the range.
+    Words are available after /get/<filename>?words=1 has transcribed the video;
+    pass the same transcription options to select that transcript.
+    """
+    try:
+        start = request.args.get('start', type=float)
+        end = request.args.get('end', type=float)
+        options = TranscriptionOptions.from_args(request.args)
+        words = get_media_service().words(filename, start, end, options)
+        return jsonify({'words': words}), 200
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': f'Invalid transcription options: {str(e)}'}), 400
+    except Exception as e:
+        logger.error(f"Error reading word timestamps: {str(e)}")
+        return jsonify({'error': str(e)}), 500
@@ -1,20 +1,23 @@
 import json
 import logging
-import google.generativeai as genai
+import threading
 from dotenv import load_dotenv
 import os
+from ..utils.metrics import timed
+from ..utils import boundary_utils
 
 # Load environment variables
 load_dotenv()
 
-# Configure Google Generative AI
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-
 # Configure logging
 logger = logging.getLogger(__name__)
 
 class AnalysisService:
     def __init__(self):
+        # The Gemini SDK is slow to import, so it is only loaded once a
+        # service is actually needed
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
         self.model = genai.GenerativeModel('gemini-1.5-flash',
             generation_config={
                 'temperature': 0.7,
@@ -56,7 +59,8 @@ Subtitles:
 """
         
         # Call Gemini API
-        response = self.model.generate_content(prompt)
+        with timed('gemini'):
+            response = self.model.generate_content(prompt)
         
         # Extract and clean the response
         result = response.text.strip()
@@ -74,4 +78,36 @@ Subtitles:
         except json.JSONDecodeError as e:
             logger.error(f"Error parsing Gemini response: {result}")
             logger.error(f"JSON decode error: {str(e)}")
-            raise ValueError('Invalid response from Gemini') 
\ No newline at end of file
+            raise ValueError('Invalid response from Gemini') 
+
+    def refine_sections(self, sections, subtitles, filepath=None, analysis_folder=None):
+        """
+        Snap suggested sections onto nearby cut points.
+        Subtitle gaps are always used; silences and scene changes are added
+        when the video's boundaries have already been detected (see the
+        `boundaries` job queued on upload). Detection never runs here, so an
+        analysis request doesn't decode the whole video.
+        """
+        silences, scenes = None, None
+        if filepath:
+            try:
+                silences, scenes = boundary_utils.load_boundaries(
+                    filepath, os.path.basename(filepath), analysis_folder, detect=False)
+                if silences is None:
+                    logger.info("Boundaries not detected yet, snapping to subtitle gaps only")
+            except Exception as e:
+                logger.warning(f"Could not load boundaries, snapping to subtitle gaps only: {str(e)}")
+        index = boundary_utils.BoundaryIndex(subtitles, silences, scenes)
+        return boundary_utils.refine_sections(sections, index)
+
+_analysis_service = None
+_analysis_service_lock = threading.Lock()
+
+def get_analysis_service():
+    """Return the process-wide AnalysisService, creating it on first use."""
+    global _analysis_service
+    if _analysis_service is None:
+        with _analysis_service_lock:
+            if _analysis_service is None:
+                _analysis_service = AnalysisService()
+    return _analysis_service
@@ -0,0 +1,191 @@
+"""
+Job Queue Module
+Durable media job queue backed by SQLite on shared storage.
+
+Web nodes enqueue jobs; workers on any box claim them with a time-limited
+lease, keep the lease alive with heartbeats while they work, and record
+the result. A job whose worker dies is picked up again once its lease
+expires, up to max_attempts times.
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+import logging
+from contextlib import contextmanager
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+JOB_KINDS = ('transcribe', 'cut', 'render', 'boundaries')
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, lease_expires, created_at);
+"""
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue.
+    Each call opens its own connection, so one queue object can be shared
+    between threads and every process on every node can point at the same
+    database file.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can
+        # never claim the same job
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def enqueue(self, kind, payload, max_attempts=3):
+        """Add a job and return its id"""
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, json.dumps(payload), QUEUED, max_attempts, now, now))
+        return job_id
+
+    def enqueue_once(self, kind, payload, max_attempts=3):
+        """
+        Add a job unless an identical one is already queued or running.
+        Returns the id of the new or the existing job.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        encoded = json.dumps(payload, sort_keys=True)
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT id FROM jobs WHERE kind = ? AND payload = ? AND status IN (?, ?) LIMIT 1',
+                (kind, encoded, QUEUED, RUNNING)).fetchone()
+            if row is not None:
+                return row['id']
+            job_id = uuid.uuid4().hex
+            conn.execute(
+                'INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (job_id, kind, encoded, QUEUED, max_attempts, now, now))
+        return job_id
+
+    def get(self, job_id):
+        """Get a job by id, or None"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def claim(self, worker_id, kinds=None, lease_seconds=60):
+        """
+        Claim the oldest runnable job for worker_id.
+        Runnable means queued, or running under a lease that has expired.
+        Jobs that have used up their attempts are marked failed instead.
+        Returns the job dictionary, or None if there is nothing to do.
+        """
+        kinds = tuple(kinds or JOB_KINDS)
+        placeholders = ','.join('?' * len(kinds))
+        now = time.time()
+        with self._transaction() as conn:
+            while True:
+                row = conn.execute(
+                    f'SELECT * FROM jobs WHERE kind IN ({placeholders}) AND '
+                    '(status = ? OR (status = ? AND lease_expires < ?)) '
+                    'ORDER BY created_at LIMIT 1',
+                    kinds + (QUEUED, RUNNING, now)).fetchone()
+                if row is None:
+                    return None
+                if row['attempts'] >= row['max_attempts']:
+                    conn.execute(
+                        'UPDATE jobs SET status = ?, error = ?, lease_owner = NULL, updated_at = ? WHERE id = ?',
+                        (FAILED, row['error'] or 'Lease expired too many times', now, row['id']))
+                    continue
+                conn.execute(
+                    'UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, '
+                    'lease_expires = ?, updated_at = ? WHERE id = ?',
+                    (RUNNING, worker_id, now + lease_seconds, now, row['id']))
+                job = self._to_dict(row)
+                job.update(status=RUNNING, attempts=row['attempts'] + 1, lease_owner=worker_id)
+                return job
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=60):
+        """Extend a lease; returns False if worker_id no longer holds it"""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET lease_expires = ?, updated_at = ? '
+                'WHERE id = ? AND lease_owner = ? AND status = ?',
+                (now + lease_seconds, now, job_id, worker_id, RUNNING))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result):
+        """Record a job's result; returns False if the lease was lost meanwhile"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = NULL, lease_owner = NULL, '
+                'lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ? AND status = ?',
+                (DONE, json.dumps(result), time.time(), job_id, worker_id, RUNNING))
+        return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error, retry=True):
+        """
+        Record a failed attempt. The job is queued again while it has
+        attempts left (and retry is set), otherwise it is marked failed.
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END, '
+                'error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? '
+                'WHERE id = ? AND lease_owner = ? AND status = ?',
+                (retry, QUEUED, FAILED, error, time.time(), job_id, worker_id, RUNNING))
+        return cursor.rowcount == 1
@@ -0,0 +1,198 @@
+"""
+Media Service Module
+Single entry point for probing, storing, cutting and transcribing uploaded
+videos. The API blueprints, the legacy routes and the workers all go
+through this service, so caching, metrics and encoder settings apply the
+same way whichever path a request takes.
+"""
+
+import os
+import logging
+import traceback
+from flask import current_app
+from werkzeug.utils import secure_filename
+from .job_queue import JobQueue
+from .subtitle_service import get_subtitle_service, TranscriptionOptions
+from ..config import PREVIEW_MODEL
+from ..utils import video_utils, boundary_utils
+from ..utils.metrics import timed, record_upload
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+class MediaService:
+    """
+    Service class for operations on uploaded videos.
+    Files are addressed by their stored filename and resolved against the
+    configured storage folders.
+    """
+
+    def __init__(self, folders, queue=None):
+        """
+        Initialize the service with the storage folders from app/config.py.
+        queue is the JobQueue preview transcripts schedule their refinement on.
+        """
+        self.queue = queue
+        self.upload_folder = str(folders['UPLOAD_FOLDER'])
+        self.cuts_folder = str(folders['CUTS_FOLDER'])
+        self.subtitles_folder = str(folders['SUBTITLES_FOLDER'])
+        self.analysis_folder = str(folders['ANALYSIS_FOLDER'])
+
+    @staticmethod
+    def allowed_file(filename):
+        """Check if file extension is allowed"""
+        return video_utils.allowed_file(filename)
+
+    def find_upload(self, filename):
+        """
+        Resolve an uploaded video's path.
+        Raises FileNotFoundError if there is no such upload.
+        """
+        # Only ever look inside the upload folder
+        filename = os.path.basename(filename or '')
+        filepath = os.path.join(self.upload_folder, filename)
+        if not filename or not os.path.isfile(filepath):
+            raise FileNotFoundError('Video file not found')
+        return filepath
+
+    def probe(self, filepath):
+        """Get duration, fps and frame size of a video"""
+        return video_utils.get_video_info(filepath)
+
+    def store_upload(self, file):
+        """
+        Save an uploaded file and probe it.
+        Raises ValueError for unsupported file types; if the file can't be
+        probed it is removed again and the error re-raised.
+        """
+        if not self.allowed_file(file.filename):
+            raise ValueError('Invalid file type')
+
+        filename = secure_filename(file.filename)
+        filepath = os.path.join(self.upload_folder, filename)
+        try:
+            # Save file in chunks
+            with timed('upload_write') as timer:
+                file.save(filepath)
+            record_upload(os.path.getsize(filepath), timer.elapsed)
+
+            video_info = self.probe(filepath)
+        except Exception:
+            logger.error(traceback.format_exc())
+            # Clean up the file if it exists
+            if os.path.exists(filepath):
+                os.remove(filepath)
+            raise
+
+        # Silence and scene detection decodes the whole video, so it runs
+        # once per upload on a worker rather than inside an analysis request
+        if self.queue is not None:
+            self.queue.enqueue_once('boundaries', {'filename': filename})
+        return {'filename': filename, **video_info}
+
+    def cut(self, filename, start_time, end_time, profile=None):
+        """
+        Cut a time range out of an uploaded video with an encoder profile.
+        Returns the cut's filename in the cuts folder.
+        """
+        input_path = self.find_upload(filename)
+        cut_filename = video_utils.cut_filename_for(os.path.basename(input_path), profile)
+        output_path = os.path.join(self.cuts_folder, cut_filename)
+
+        logger.info(f"Starting video cut: {input_path} -> {output_path}")
+        logger.info(f"Time range: {start_time} - {end_time}, profile: {profile or 'default'}")
+        video_utils.cut_video(input_path, output_path, start_time, end_time, profile)
+        logger.info(f"Video cut completed successfully: {cut_filename}")
+        return cut_filename
+
+    def detect_boundaries(self, filename):
+        """
+        Detect (or reuse) the silences and scene changes of an uploaded video.
+        Returns (silences, scenes) as flat float arrays.
+        """
+        filepath = self.find_upload(filename)
+        return boundary_utils.load_boundaries(filepath, os.path.basename(filepath), self.analysis_folder)
+
+    def check_subtitles(self, filename):
+        """Check if an uploaded video has embedded subtitles"""
+        return video_utils.check_subtitles(self.find_upload(filename))
+
+    def transcribe(self, filename, options=None):
+        """Transcribe an uploaded video to SRT; returns (srt_path, metadata)"""
+        srt_path, metadata, _ = get_subtitle_service().transcribe_to_srt(
+            self.find_upload(filename), self.subtitles_folder, options)
+        return srt_path, metadata
+
+    def refine_transcript(self, filename, options=None):
+        """
+        Transcribe an uploaded video with the full model and drop the
+        preview transcript it replaces; returns (srt_path, metadata).
+        """
+        srt_path, metadata = self.transcribe(filename, options)
+        get_subtitle_service(PREVIEW_MODEL).discard_transcript(
+            self.find_upload(filename), self.subtitles_folder, options)
+        return srt_path, metadata
+
+    def subtitle_file(self, filename, language=None, options=None):
+        """
+        Get an SRT file for an uploaded video: the preferred embedded track
+        if there is one, otherwise a (cached) Whisper transcript.
+        """
+        filepath = self.find_upload(filename)
+        subtitle_path = video_utils.extract_subtitles(
+            filepath, os.path.basename(filepath), self.subtitles_folder, language)
+        if not subtitle_path:
+            logger.info("No embedded subtitles found, using Whisper to generate subtitles")
+            subtitle_path, _ = self.transcribe(filename, options)
+        return subtitle_path
+
+    def subtitles_json(self, filename, language=None, options=None, preview=False):
+        """
+        Get subtitles of an uploaded video in JSON format.
+        With preview, a video that needs a Whisper transcript and has no
+        full-model one yet gets a preview-model transcript straight away,
+        and a transcribe job is queued to replace it. Whisper results then
+        say whether they are `refined` and, if not, carry the
+        `refine_job_id` to poll.
+        """
+        filepath = self.find_upload(filename)
+        service = get_subtitle_service()
+        refined = (not preview or self.queue is None
+                   or service.has_transcript(filepath, self.subtitles_folder, options))
+        if not refined:
+            service = get_subtitle_service(PREVIEW_MODEL)
+        result = service.get_subtitles_json(filepath, self.subtitles_folder, language, options)
+
+        if preview and result['source'] == 'whisper':
+            result['refined'] = refined
+            if not refined:
+                result['refine_job_id'] = self.queue.enqueue_once('transcribe', {
+                    'filename': os.path.basename(filepath),
+                    'options': (options or TranscriptionOptions()).as_args(),
+                    'refine': True
+                })
+        return result
+
+    def subtitle_tracks(self, filename, languages=None):
+        """Extract and list the embedded text subtitle tracks of an uploaded video"""
+        return get_subtitle_service().get_subtitle_tracks(
+            self.find_upload(filename), self.subtitles_folder, languages)
+
+    def words(self, filename, start=None, end=None, options=None):
+        """Get word-level timings of an uploaded video's transcript"""
+        filepath = self.find_upload(filename)
+        try:
+            return get_subtitle_service().get_words(filepath, self.subtitles_folder, start, end, options)
+        except FileNotFoundError:
+            # Until the refined transcript is ready, serve the preview's words
+            return get_subtitle_service(PREVIEW_MODEL).get_words(
+                filepath, self.subtitles_folder, start, end, options)
+
+
+def init_app(app):
+    """Create the app's MediaService from its configured storage folders."""
+    app.extensions['media_service'] = MediaService(app.config, JobQueue(app.config['QUEUE_PATH']))
+
+def get_media_service():
+    """Return the MediaService of the current app."""
+    return current_app.extensions['media_service']
@@ -4,13 +4,117 @@ Provides functionality for handling video subtitles including extraction, parsin
 """
 
 import os
+import json
+import shutil
+import hashlib
 import logging
-from faster_whisper import WhisperModel
-from ..utils.video_utils import generate_srt, extract_subtitles, timestamp_to_seconds
+import tempfile
+import threading
+from contextlib import contextmanager
+from ..config import WHISPER_MODEL
+from ..utils.video_utils import generate_srt, extract_subtitle_tracks, parse_srt, probe_media
+from ..utils.memory_budget import get_memory_budget, estimate_transcription
+from ..utils.metrics import timed, record_transcription
+from ..utils.word_store import WordStoreWriter, has_words, WordTimeline
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+class TranscriptionOptions:
+    """
+    Whisper decoding options for a transcription request.
+    Everything here changes the transcript, so the options are part of the
+    transcript cache key.
+    """
+
+    # faster-whisper's own defaults for the Silero VAD parameters
+    VAD_DEFAULTS = {'threshold': 0.5, 'min_silence_duration_ms': 2000, 'speech_pad_ms': 400}
+    TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+    def __init__(self, language=None, beam_size=5, condition_on_previous_text=True,
+                 vad_filter=False, vad_parameters=None, word_timestamps=False):
+        if beam_size < 1:
+            raise ValueError('beam_size must be at least 1')
+        self.language = language
+        self.beam_size = beam_size
+        self.condition_on_previous_text = condition_on_previous_text
+        self.vad_filter = vad_filter
+        self.vad_parameters = {**self.VAD_DEFAULTS, **(vad_parameters or {})} if vad_filter else None
+        self.word_timestamps = word_timestamps
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Build options from request query parameters:
+        transcribe_language (code or 'auto'), beam_size, condition_on_previous_text,
+        vad, vad_threshold, vad_min_silence_ms, vad_speech_pad_ms and words.
+        Raises ValueError for malformed values.
+        """
+        def flag(name, default):
+            value = args.get(name)
+            return default if value is None else str(value).lower() in cls.TRUE_VALUES
+
+        language = str(args.get('transcribe_language') or 'auto').strip().lower()
+        vad_parameters = {}
+        for param, key, cast in (('vad_threshold', 'threshold', float),
+                                 ('vad_min_silence_ms', 'min_silence_duration_ms', int),
+                                 ('vad_speech_pad_ms', 'speech_pad_ms', int)):
+            if args.get(param) is not None:
+                vad_parameters[key] = cast(args.get(param))
+
+        return cls(
+            language=None if language in ('', 'auto') else language,
+            beam_size=int(args.get('beam_size', 5)),
+            condition_on_previous_text=flag('condition_on_previous_text', True),
+            # Tuning a VAD parameter implies wanting VAD
+            vad_filter=flag('vad', bool(vad_parameters)),
+            vad_parameters=vad_parameters,
+            word_timestamps=flag('words', False)
+        )
+
+    def with_word_timestamps(self):
+        """Copy of these options with word timestamps enabled"""
+        return TranscriptionOptions(self.language, self.beam_size, self.condition_on_previous_text,
+                                    self.vad_filter, self.vad_parameters, True)
+
+    def as_args(self):
+        """These options as the query parameters from_args() accepts"""
+        args = {
+            'transcribe_language': self.language or 'auto',
+            'beam_size': self.beam_size,
+            'condition_on_previous_text': self.condition_on_previous_text,
+            'vad': self.vad_filter,
+            'words': self.word_timestamps
+        }
+        if self.vad_filter:
+            args.update(vad_threshold=self.vad_parameters['threshold'],
+                        vad_min_silence_ms=self.vad_parameters['min_silence_duration_ms'],
+                        vad_speech_pad_ms=self.vad_parameters['speech_pad_ms'])
+        return args
+
+    def as_dict(self):
+        return {
+            'language': self.language,
+            'beam_size': self.beam_size,
+            'condition_on_previous_text': self.condition_on_previous_text,
+            'vad_filter': self.vad_filter,
+            'vad_parameters': self.vad_parameters,
+            'word_timestamps': self.word_timestamps
+        }
+
+    def transcribe_kwargs(self):
+        """Keyword arguments for WhisperModel.transcribe"""
+        kwargs = self.as_dict()
+        if not self.vad_filter:
+            del kwargs['vad_parameters']
+        return kwargs
+
+    def cache_key(self, model_size):
+        """Short stable hash of the model and options"""
+        payload = json.dumps({'model': model_size, **self.as_dict()}, sort_keys=True)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+
+
 class SubtitleService:
     """
     Service class for handling subtitle-related operations.
@@ -18,89 +122,196 @@ class SubtitleService:
     and formatting subtitle data.
     """
     
-    def __init__(self, model_size="small"):
+    def __init__(self, model_size=WHISPER_MODEL):
         """Initialize the subtitle service with default configurations."""
-        self.model = WhisperModel(model_size)
+        self.model_size = model_size
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    @property
+    def model(self):
+        """Whisper model, loaded on first use so importing the app stays fast."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    # faster_whisper pulls in CTranslate2; keep it off the import path
+                    from faster_whisper import WhisperModel
+                    logger.info(f"Loading Whisper model '{self.model_size}'")
+                    self._model = WhisperModel(self.model_size)
+        return self._model
 
-    def transcribe_with_whisper(self, filepath, output_path):
-        """Transcribe video using Whisper and save as SRT"""
+    @contextmanager
+    def transcribe(self, filepath, options=None):
+        """
+        Transcribe a media file with Whisper:
+            with service.transcribe(filepath) as (segments, info):
+                ...
+        Segments are a generator decoded as it is consumed, so callers can
+        write them out without holding the whole transcript. The job's
+        memory reservation and the transcription timer last until the block
+        exits. Audio decoding and decoding of the transcript are timed
+        separately.
+        """
+        from faster_whisper.audio import decode_audio
+
+        options = options or TranscriptionOptions()
+        model = self.model
+        duration = float(probe_media(filepath)['format'].get('duration') or 0)
+        with get_memory_budget().reserve(estimate_transcription(duration),
+                                         f"transcription of {os.path.basename(filepath)}"):
+            with timed('audio_extract'):
+                audio = decode_audio(filepath, sampling_rate=model.feature_extractor.sampling_rate)
+            with timed('transcribe') as timer:
+                segments, info = model.transcribe(audio, **options.transcribe_kwargs())
+                yield segments, info
+            record_transcription(info.duration, timer.elapsed)
+
+    def transcript_paths(self, filepath, subtitles_folder, options=None):
+        """
+        Get the SRT path, word store directory and metadata sidecar path of
+        a video's Whisper transcript for the given options.
+        """
+        options = options or TranscriptionOptions()
+        stem = os.path.splitext(os.path.basename(filepath))[0]
+        base = os.path.join(subtitles_folder, f"{stem}_whisper_{options.cache_key(self.model_size)}")
+        return f"{base}.srt", f"{base}.words", f"{base}.srt.json"
+
+    def has_transcript(self, filepath, subtitles_folder, options=None):
+        """Check for a complete transcript made with these options since the video last changed"""
+        options = options or TranscriptionOptions()
+        srt_path, words_dir, metadata_path = self.transcript_paths(filepath, subtitles_folder, options)
+        return (os.path.exists(metadata_path) and os.path.exists(srt_path)
+                and os.path.getmtime(metadata_path) >= os.path.getmtime(filepath)
+                and (not options.word_timestamps or has_words(words_dir)))
+
+    def discard_transcript(self, filepath, subtitles_folder, options=None):
+        """Remove a stored transcript, e.g. a preview that has been superseded"""
+        srt_path, words_dir, metadata_path = self.transcript_paths(filepath, subtitles_folder, options)
+        # Sidecar first, so a half-removed transcript never looks complete
+        for path in (metadata_path, srt_path):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(words_dir, ignore_errors=True)
+
+    def transcribe_to_srt(self, filepath, subtitles_folder, options=None):
+        """
+        Transcribe a video to SRT, reusing an earlier transcript made with
+        the same model and options while the video is unchanged.
+        Returns (srt_path, metadata, cached).
+        """
+        options = options or TranscriptionOptions()
+        srt_path, words_dir, metadata_path = self.transcript_paths(filepath, subtitles_folder, options)
+        
+        if self.has_transcript(filepath, subtitles_folder, options):
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                return srt_path, json.load(f), True
+        
+        # Cues are written as Whisper produces them; word timings, if
+        # requested, go straight into the word store's flat arrays
+        words = WordStoreWriter() if options.word_timestamps else None
+        def keep_words(segments):
+            for segment in segments:
+                if words is not None:
+                    words.add_segment(segment)
+                yield segment
+        
+        # Each transcription writes to its own scratch file, so concurrent
+        # transcriptions of the same video (e.g. a request and a worker
+        # refining a preview) can't interleave their cues
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(srt_path)}.", suffix='.tmp',
+                                        dir=subtitles_folder)
+        os.close(fd)
         try:
-            # Transcribe the video
-            segments, info = self.model.transcribe(filepath)
-            language = info.language
-            segments = list(segments)
-            
-            # Generate SRT file
-            generate_srt(segments, output_path)
-            
-            return True
-        except Exception as e:
-            logger.error(f"Error transcribing with Whisper: {str(e)}")
-            return False
+            with self.transcribe(filepath, options) as (segments, info):
+                generate_srt(keep_words(segments), tmp_path)
+            os.replace(tmp_path, srt_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        metadata = {
+            'language': info.language,
+            'language_probability': info.language_probability,
+            'duration': info.duration,
+            'duration_after_vad': info.duration_after_vad,
+            'model': self.model_size,
+            'options': options.as_dict()
+        }
+        if options.word_timestamps:
+            metadata['word_count'] = words.save(words_dir)
+        
+        # The sidecar is written last so it only exists for complete transcripts
+        tmp_path = f"{metadata_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        os.replace(tmp_path, metadata_path)
+        return srt_path, metadata, False
 
-    def get_subtitles_json(self, filepath, subtitles_folder):
-        """Get subtitles in JSON format"""
+    def get_words(self, filepath, subtitles_folder, start=None, end=None, options=None):
+        """
+        Get word-level timings overlapping [start, end) from the stored
+        transcript. Raises FileNotFoundError if the video hasn't been
+        transcribed with word timestamps and these options yet.
+        """
+        options = (options or TranscriptionOptions()).with_word_timestamps()
+        _, words_dir, _ = self.transcript_paths(filepath, subtitles_folder, options)
+        if not has_words(words_dir):
+            raise FileNotFoundError('No word timestamps stored for this video')
+        return WordTimeline(words_dir).between(start, end)
+
+    def get_subtitle_tracks(self, filepath, subtitles_folder, languages=None):
+        """Extract and list the embedded text subtitle tracks of a video"""
+        return extract_subtitle_tracks(filepath, os.path.basename(filepath), subtitles_folder, languages)
+
+    def get_subtitles_json(self, filepath, subtitles_folder, language=None, options=None):
+        """
+        Get subtitles in JSON format.
+        language selects an embedded track; options control the Whisper
+        fallback. Whisper transcripts are cached in subtitles_folder, and
+        with word timestamps the per-word timings are stored alongside them
+        and can be fetched with get_words().
+        """
         try:
             # First try to extract embedded subtitles
-            subtitle_path = extract_subtitles(filepath, os.path.basename(filepath), subtitles_folder)
+            tracks = self.get_subtitle_tracks(filepath, subtitles_folder, [language] if language else None)
             
             # If no embedded subtitles found, use Whisper to generate them
-            if not subtitle_path:
+            if not tracks:
                 logger.info("No embedded subtitles found, using Whisper to generate subtitles")
                 
-                # Transcribe the video
-                segments, info = self.model.transcribe(filepath)
-                language = info.language
-                segments = list(segments)
+                srt_path, metadata, cached = self.transcribe_to_srt(filepath, subtitles_folder, options)
                 
-                # Format subtitles as a list of dictionaries
-                formatted_subtitles = []
-                for segment in segments:
-                    formatted_subtitles.append({
-                        'start': segment.start,
-                        'end': segment.end,
-                        'text': segment.text.strip()
-                    })
-                
-                return {
-                    'subtitles': formatted_subtitles,
-                    'language': language,
-                    'source': 'whisper'
+                result = {
+                    'subtitles': parse_srt(srt_path),
+                    'language': metadata['language'],
+                    'source': 'whisper',
+                    'model': metadata['model'],
+                    'cached': cached
                 }
+                if 'word_count' in metadata:
+                    result['word_count'] = metadata['word_count']
+                return result
             
-            # If embedded subtitles were found, parse the SRT file
-            with open(subtitle_path, 'r', encoding='utf-8') as f:
-                srt_content = f.read()
-                
-            # Parse SRT content into a structured format
-            subtitle_blocks = srt_content.strip().split('\n\n')
-            formatted_subtitles = []
-            
-            for block in subtitle_blocks:
-                lines = block.strip().split('\n')
-                if len(lines) >= 3:
-                    # Parse timestamp line
-                    timestamp_line = lines[1]
-                    start_time, end_time = timestamp_line.split(' --> ')
-                    
-                    start_seconds = timestamp_to_seconds(start_time)
-                    end_seconds = timestamp_to_seconds(end_time)
-                    
-                    # Get subtitle text
-                    text = ' '.join(lines[2:])
-                    
-                    formatted_subtitles.append({
-                        'start': start_seconds,
-                        'end': end_seconds,
-                        'text': text
-                    })
+            # If embedded subtitles were found, parse the preferred track
+            formatted_subtitles = parse_srt(tracks[0]['path'])
             
             return {
                 'subtitles': formatted_subtitles,
-                'language': 'unknown',  # SRT doesn't typically include language info
+                'language': tracks[0]['language'],
                 'source': 'embedded'
             }
             
         except Exception as e:
             logger.error(f"Error extracting subtitles: {str(e)}")
-            raise 
\ No newline at end of file
+            raise 
+
+_subtitle_services = {}
+_subtitle_service_lock = threading.Lock()
+
+def get_subtitle_service(model_size=WHISPER_MODEL):
+    """Return the process-wide SubtitleService for a model, creating it on first use."""
+    if model_size not in _subtitle_services:
+        with _subtitle_service_lock:
+            if model_size not in _subtitle_services:
+                _subtitle_services[model_size] = SubtitleService(model_size)
+    return _subtitle_services[model_size]
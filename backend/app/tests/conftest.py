@@ -0,0 +1,77 @@
+"""
+Shared pytest fixtures.
+Every app built here stores uploads, cuts, subtitles, analysis artifacts
+and the job queue under the test's temporary directory.
+"""
+
+from collections import namedtuple
+from contextlib import contextmanager
+import pytest
+from app import config as app_config
+from app.services.subtitle_service import SubtitleService
+
+# Stand-ins for what faster-whisper yields
+Segment = namedtuple('Segment', 'start end text words')
+Info = namedtuple('Info', 'language language_probability duration duration_after_vad')
+
+
+class FakeSubtitleService(SubtitleService):
+    """
+    Transcribes every video to fixed two-second cues instead of running
+    Whisper, and finds no embedded tracks. Without texts the single cue
+    names the model.
+    """
+
+    def __init__(self, model_size='fake', texts=None):
+        super().__init__(model_size)
+        self.texts = [model_size] if texts is None else texts
+        self.calls = 0
+
+    @contextmanager
+    def transcribe(self, filepath, options=None):
+        self.calls += 1
+        segments = (Segment(i * 2.0, i * 2.0 + 1.5, f" {text} ", []) for i, text in enumerate(self.texts))
+        duration = len(self.texts) * 2.0
+        yield segments, Info('en', 0.99, duration, duration)
+
+    def get_subtitle_tracks(self, filepath, subtitles_folder, languages=None):
+        return []
+
+
+def pytest_addoption(parser):
+    parser.addoption('--runslow', action='store_true', default=False,
+                     help='Run slow tests (long media stress runs)')
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'slow: long-running test, only run with --runslow')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--runslow'):
+        return
+    skip_slow = pytest.mark.skip(reason='slow test, use --runslow to run')
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_config, 'STORAGE_ROOT', tmp_path)
+    monkeypatch.delenv('MOVIE_SHORTS_QUEUE_DB', raising=False)
+    monkeypatch.setenv('MOVIE_SHORTS_INPROCESS_WORKER', '')
+    from app.app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def fake_subtitle_service():
+    return FakeSubtitleService
@@ -0,0 +1,66 @@
+import os
+import pytest
+from app.routes import analysis_routes
+from app.services.analysis_service import AnalysisService
+from app.utils.boundary_utils import _sidecar_paths, _write_array
+
+SUBTITLES = [
+    {'start': 1.0, 'end': 4.0, 'text': 'one'},
+    {'start': 6.0, 'end': 9.0, 'text': 'two'},
+]
+
+
+@pytest.fixture
+def analysis_service(monkeypatch):
+    # Skip __init__ so Gemini is never configured; refinement is real
+    service = AnalysisService.__new__(AnalysisService)
+    service.analyze_subtitles = lambda subtitles: [{'start': 5.5, 'end': 8.2, 'type': 'funny'}]
+    monkeypatch.setattr(analysis_routes, 'get_analysis_service', lambda: service)
+    return service
+
+
+def test_analyze_refines_to_subtitle_gaps(client, analysis_service):
+    response = client.post('/api/analysis/analyze-subtitles', json={'subtitles': SUBTITLES})
+    assert response.status_code == 200
+    section = response.get_json()['sections'][0]
+    assert section['start'] == 5.0
+    assert section['original_start'] == 5.5
+    assert section['snapped']['start'] == 'subtitle_gap'
+
+
+def test_analyze_without_refinement(client, analysis_service):
+    response = client.post('/api/analysis/analyze-subtitles',
+                           json={'subtitles': SUBTITLES, 'refine': False})
+    assert response.status_code == 200
+    assert response.get_json()['sections'] == [{'start': 5.5, 'end': 8.2, 'type': 'funny'}]
+
+
+def test_analyze_uses_detected_boundaries(app, client, analysis_service):
+    upload_path = os.path.join(app.config['UPLOAD_FOLDER'], 'movie.mp4')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really a video')
+    silence_path, scenes_path = _sidecar_paths('movie.mp4', str(app.config['ANALYSIS_FOLDER']))
+    _write_array(silence_path, [7.8, 8.4])
+    _write_array(scenes_path, [])
+
+    response = client.post('/api/analysis/analyze-subtitles',
+                           json={'subtitles': SUBTITLES, 'filename': 'movie.mp4'})
+    assert response.status_code == 200
+    section = response.get_json()['sections'][0]
+    assert section['end'] == pytest.approx(8.1)
+    assert section['snapped']['end'] == 'silence'
+
+
+def test_analyze_does_not_detect_boundaries_inline(app, client, analysis_service, monkeypatch):
+    upload_path = os.path.join(app.config['UPLOAD_FOLDER'], 'movie.mp4')
+    with open(upload_path, 'wb') as f:
+        f.write(b'not really a video')
+
+    def fail(filepath):
+        raise AssertionError('boundary detection ran inside the request')
+    monkeypatch.setattr('app.utils.boundary_utils.detect_boundaries', fail)
+
+    response = client.post('/api/analysis/analyze-subtitles',
+                           json={'subtitles': SUBTITLES, 'filename': 'movie.mp4'})
+    assert response.status_code == 200
+    assert response.get_json()['sections'][0]['snapped']['start'] == 'subtitle_gap'
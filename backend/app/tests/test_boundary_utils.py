@@ -0,0 +1,62 @@
+from array import array
+from app.utils.boundary_utils import BoundaryIndex, refine_sections, _write_array, _sidecar_paths
+
+
+SUBTITLES = [
+    {'start': 1.0, 'end': 4.0, 'text': 'one'},
+    {'start': 6.0, 'end': 9.0, 'text': 'two'},
+    {'start': 12.0, 'end': 15.0, 'text': 'three'},
+]
+
+
+def test_subtitle_gaps_are_gap_midpoints():
+    index = BoundaryIndex(SUBTITLES)
+    assert list(index.subtitle_gaps) == [0.5, 5.0, 10.5]
+
+
+def test_snap_moves_to_nearest_subtitle_gap():
+    index = BoundaryIndex(SUBTITLES)
+    assert index.snap(5.8) == (5.0, 'subtitle_gap')
+
+
+def test_snap_keeps_time_without_candidates():
+    index = BoundaryIndex(SUBTITLES)
+    assert index.snap(30.0) == (30.0, None)
+
+
+def test_snap_prefers_silence_over_closer_scene():
+    index = BoundaryIndex(silences=[19.0, 21.0], scenes=[20.5])
+    assert index.snap(20.6) == (20.0, 'silence')
+
+
+def test_scene_inside_silence_gets_bonus():
+    subtitles = [{'start': 0.0, 'end': 40.0}, {'start': 41.0, 'end': 50.0}]
+    assert BoundaryIndex(subtitles, scenes=[42.0]).snap(41.5) == (40.5, 'subtitle_gap')
+    index = BoundaryIndex(subtitles, silences=[41.9, 43.5], scenes=[42.0])
+    assert index.in_silence(42.0)
+    assert index.snap(41.5) == (42.0, 'scene')
+
+
+def test_snap_respects_bounds():
+    index = BoundaryIndex(SUBTITLES)
+    assert index.snap(5.8, lo=5.5) == (5.8, None)
+
+
+def test_refine_sections_keeps_originals_and_min_length():
+    index = BoundaryIndex(SUBTITLES)
+    refined = refine_sections([{'start': 5.5, 'end': 10.0, 'type': 'funny'}], index)
+    section = refined[0]
+    assert section['type'] == 'funny'
+    assert (section['start'], section['end']) == (5.0, 10.5)
+    assert (section['original_start'], section['original_end']) == (5.5, 10.0)
+    assert section['snapped'] == {'start': 'subtitle_gap', 'end': 'subtitle_gap'}
+    assert section['end'] - section['start'] >= 1.0
+
+
+def test_sidecar_arrays_round_trip(tmp_path):
+    silence_path, _ = _sidecar_paths('movie.mp4', str(tmp_path))
+    _write_array(silence_path, [1.5, 2.5])
+    with open(silence_path, 'rb') as f:
+        values = array('f')
+        values.frombytes(f.read())
+    assert list(values) == [1.5, 2.5]
@@ -0,0 +1,77 @@
+import pytest
+from app.utils import encoder_profiles
+from app.utils.encoder_profiles import (ENCODER_PROFILES, get_profile, select_threads, select_preset,
+                                        build_encode_command)
+
+
+@pytest.fixture(autouse=True)
+def idle_machine(monkeypatch):
+    monkeypatch.setattr(encoder_profiles, 'available_cores', lambda: 8)
+    monkeypatch.setattr(encoder_profiles, 'current_load', lambda: 0.0)
+
+
+def option(cmd, flag):
+    return cmd[cmd.index(flag) + 1]
+
+
+def test_get_profile():
+    assert get_profile() is ENCODER_PROFILES['balanced']
+    with pytest.raises(ValueError):
+        get_profile('lossless')
+
+
+def test_select_threads_uses_idle_cores():
+    assert select_threads(8, 0.0) == 8
+    assert select_threads(8, 5.6) == 2
+    assert select_threads(8, 20.0) == 1
+
+
+def test_select_preset_steps_faster_under_load():
+    assert select_preset('fast', 8, 8.0) == 'fast'
+    assert select_preset('fast', 8, 12.0) == 'faster'
+    assert select_preset('fast', 8, 24.0) == 'veryfast'
+    assert select_preset('veryfast', 8, 100.0) == 'ultrafast'
+    # Encoders without x264-style presets are left alone
+    assert select_preset('good', 8, 100.0) == 'good'
+
+
+def test_command_cuts_range_with_profile():
+    cmd = build_encode_command('in.mkv', 'out.mp4', 12.5, 30.0, get_profile('balanced'), 'ac3')
+    assert cmd[0] == 'ffmpeg'
+    assert cmd.index('-ss') < cmd.index('-i')
+    assert (option(cmd, '-ss'), option(cmd, '-i'), option(cmd, '-t')) == ('12.500', 'in.mkv', '30.000')
+    assert (option(cmd, '-c:v'), option(cmd, '-crf'), option(cmd, '-preset')) == ('libx264', '23', 'fast')
+    assert option(cmd, '-threads') == '8'
+    assert cmd[-1] == 'out.mp4'
+    assert '+faststart' in cmd
+
+
+def test_command_copies_compatible_audio():
+    cmd = build_encode_command('in.mp4', 'out.mp4', 0, 10, get_profile('balanced'), 'aac')
+    assert option(cmd, '-c:a') == 'copy'
+    assert '-b:a' not in cmd
+
+
+def test_command_transcodes_other_audio():
+    cmd = build_encode_command('in.mkv', 'out.mp4', 0, 10, get_profile('balanced'), 'flac')
+    assert (option(cmd, '-c:a'), option(cmd, '-b:a')) == ('aac', '128k')
+
+
+def test_command_without_audio_stream():
+    cmd = build_encode_command('in.mp4', 'out.mp4', 0, 10, get_profile('fast-preview'), None)
+    assert option(cmd, '-c:a') == 'aac'
+    assert '0:a:0?' in cmd
+
+
+def test_vp9_command_has_no_preset():
+    cmd = build_encode_command('in.mp4', 'out.webm', 0, 10, get_profile('web-vp9'), 'opus')
+    assert '-preset' not in cmd
+    assert option(cmd, '-c:a') == 'copy'
+    assert option(cmd, '-b:v') == '0'
+
+
+def test_preset_reacts_to_load(monkeypatch):
+    monkeypatch.setattr(encoder_profiles, 'current_load', lambda: 16.0)
+    cmd = build_encode_command('in.mp4', 'out.mp4', 0, 10, get_profile('archive'), 'aac')
+    assert option(cmd, '-preset') == 'medium'
+    assert option(cmd, '-threads') == '1'
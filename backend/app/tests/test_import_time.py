@@ -0,0 +1,34 @@
+import os
+import sys
+import json
+import subprocess
+
+# Seconds a cold `import app.app` may take; matches the benchmark's --import-budget
+IMPORT_BUDGET_SECONDS = float(os.getenv('MOVIE_SHORTS_IMPORT_BUDGET', 1.0))
+
+# Loaded on first use only; importing any of them makes startup slow
+HEAVY_MODULES = ('faster_whisper', 'moviepy', 'google.generativeai', 'ctranslate2')
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CODE = f"""
+import json, sys, time
+start = time.perf_counter()
+import app.app
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def import_app():
+    result = subprocess.run([sys.executable, '-c', CODE], cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_is_within_budget():
+    assert import_app()['seconds'] <= IMPORT_BUDGET_SECONDS
+
+
+def test_import_does_not_load_heavy_modules():
+    assert import_app()['loaded'] == []
@@ -0,0 +1,101 @@
+import time
+import pytest
+from app.services.job_queue import JobQueue, QUEUED, RUNNING, DONE, FAILED
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(tmp_path / 'queue.sqlite3')
+
+
+def test_enqueue_and_claim(queue):
+    job_id = queue.enqueue('cut', {'filename': 'a.mp4'})
+    job = queue.claim('w1')
+    assert job['id'] == job_id
+    assert job['payload'] == {'filename': 'a.mp4'}
+    assert (job['status'], job['attempts'], job['lease_owner']) == (RUNNING, 1, 'w1')
+    assert queue.claim('w2') is None
+
+
+def test_claim_oldest_first_and_by_kind(queue):
+    first = queue.enqueue('cut', {'n': 1})
+    second = queue.enqueue('transcribe', {'n': 2})
+    assert queue.claim('w1', kinds=['transcribe'])['id'] == second
+    assert queue.claim('w1')['id'] == first
+
+
+def test_unknown_kind_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.enqueue('upload', {})
+    with pytest.raises(ValueError):
+        queue.enqueue_once('upload', {})
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = queue.enqueue('cut', {})
+    queue.claim('w1', lease_seconds=0.05)
+    assert queue.claim('w2') is None
+    time.sleep(0.1)
+    job = queue.claim('w2')
+    assert (job['id'], job['lease_owner'], job['attempts']) == (job_id, 'w2', 2)
+    # The old owner can no longer renew or finish it
+    assert not queue.heartbeat(job_id, 'w1')
+    assert not queue.complete(job_id, 'w1', {'ok': True})
+    assert queue.complete(job_id, 'w2', {'ok': True})
+    assert queue.get(job_id)['result'] == {'ok': True}
+
+
+def test_heartbeat_extends_lease(queue):
+    job_id = queue.enqueue('cut', {})
+    queue.claim('w1', lease_seconds=0.05)
+    assert queue.heartbeat(job_id, 'w1', lease_seconds=60)
+    time.sleep(0.1)
+    assert queue.claim('w2') is None
+
+
+def test_fail_retries_until_max_attempts(queue):
+    job_id = queue.enqueue('cut', {}, max_attempts=2)
+    queue.claim('w1')
+    assert queue.fail(job_id, 'w1', 'boom')
+    assert queue.get(job_id)['status'] == QUEUED
+    queue.claim('w1')
+    queue.fail(job_id, 'w1', 'boom again')
+    job = queue.get(job_id)
+    assert (job['status'], job['error'], job['attempts']) == (FAILED, 'boom again', 2)
+    assert queue.claim('w1') is None
+
+
+def test_fail_without_retry(queue):
+    job_id = queue.enqueue('cut', {})
+    queue.claim('w1')
+    queue.fail(job_id, 'w1', 'bad payload', retry=False)
+    assert queue.get(job_id)['status'] == FAILED
+
+
+def test_expired_leases_count_towards_max_attempts(queue):
+    job_id = queue.enqueue('cut', {}, max_attempts=1)
+    queue.claim('w1', lease_seconds=0.01)
+    time.sleep(0.05)
+    assert queue.claim('w2') is None
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['error'] == 'Lease expired too many times'
+
+
+def test_enqueue_once_deduplicates_active_jobs(queue):
+    first = queue.enqueue_once('transcribe', {'filename': 'a.mp4', 'options': {'b': 1, 'a': 2}})
+    # Key order doesn't matter
+    assert queue.enqueue_once('transcribe', {'options': {'a': 2, 'b': 1}, 'filename': 'a.mp4'}) == first
+    assert queue.enqueue_once('transcribe', {'filename': 'b.mp4'}) != first
+    assert queue.enqueue_once('cut', {'filename': 'a.mp4', 'options': {'b': 1, 'a': 2}}) != first
+
+    queue.claim('w1', kinds=['transcribe'])
+    assert queue.enqueue_once('transcribe', {'filename': 'a.mp4', 'options': {'a': 2, 'b': 1}}) == first
+
+
+def test_enqueue_once_requeues_finished_jobs(queue):
+    first = queue.enqueue_once('boundaries', {'filename': 'a.mp4'})
+    queue.claim('w1')
+    queue.complete(first, 'w1', {})
+    assert queue.get(first)['status'] == DONE
+    assert queue.enqueue_once('boundaries', {'filename': 'a.mp4'}) != first
@@ -0,0 +1,111 @@
+import os
+import time
+import pytest
+from app.app import create_app
+from app.config import in_process_worker_kinds
+from app.services import media_service
+from app.services.job_queue import DONE
+from app.worker import start_in_process_worker
+
+
+@pytest.fixture
+def upload(app):
+    with open(os.path.join(app.config['UPLOAD_FOLDER'], 'clip.mp4'), 'wb') as f:
+        f.write(b'video')
+    return 'clip.mp4'
+
+
+@pytest.fixture
+def subtitle_services(monkeypatch, fake_subtitle_service):
+    services = {}
+
+    def get_service(model_size='small'):
+        return services.setdefault(model_size, fake_subtitle_service(model_size))
+    monkeypatch.setattr(media_service, 'get_subtitle_service', get_service)
+    monkeypatch.setattr(media_service, 'PREVIEW_MODEL', 'tiny')
+    return services
+
+
+def test_create_and_get_job(app, client, upload):
+    response = client.post('/api/jobs', json={'kind': 'cut', 'payload': {'filename': upload}})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+
+    # Routes and the media service share one queue
+    assert app.extensions['media_service'].queue.get(job_id)['kind'] == 'cut'
+    body = client.get(f'/api/jobs/{job_id}').get_json()
+    assert (body['kind'], body['status'], body['attempts']) == ('cut', 'queued', 0)
+
+
+def test_create_job_validation(client, upload):
+    assert client.post('/api/jobs', json={'kind': 'upload', 'payload': {'filename': upload}}).status_code == 400
+    assert client.post('/api/jobs', json={'kind': 'cut', 'payload': {'filename': 'nope.mp4'}}).status_code == 404
+    assert client.get('/api/jobs/unknown').status_code == 404
+
+
+def test_create_job_rejects_non_json_body(client):
+    assert client.post('/api/jobs', data='kind=cut').status_code == 400
+    assert client.post('/api/jobs', data='{not json', content_type='application/json').status_code == 400
+    assert client.post('/api/jobs', json=['cut']).status_code == 400
+    assert client.post('/api/jobs', json={'kind': 'cut', 'payload': 'clip.mp4'}).status_code == 400
+
+
+def test_preview_then_refined_transcript(app, client, upload, subtitle_services):
+    response = client.get(f'/api/subtitles/get/{upload}?preview=1')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['refined'] is False
+    assert body['model'] == 'tiny'
+    assert body['subtitles'][0]['text'] == 'tiny'
+
+    # Asking again while the refinement is pending reuses the same job
+    job_id = body['refine_job_id']
+    assert client.get(f'/api/subtitles/get/{upload}?preview=1').get_json()['refine_job_id'] == job_id
+
+    job = app.extensions['media_service'].queue.get(job_id)
+    assert job['kind'] == 'transcribe' and job['payload']['refine'] is True
+
+    # What a worker does with the job
+    app.extensions['media_service'].refine_transcript(upload)
+    preview_srt, _, _ = subtitle_services['tiny'].transcript_paths(
+        os.path.join(app.config['UPLOAD_FOLDER'], upload), str(app.config['SUBTITLES_FOLDER']))
+    assert not os.path.exists(preview_srt)
+
+    body = client.get(f'/api/subtitles/get/{upload}?preview=1').get_json()
+    assert body['refined'] is True
+    assert 'refine_job_id' not in body
+    assert body['subtitles'][0]['text'] == 'small'
+
+
+def test_without_preview_uses_full_model(client, upload, subtitle_services):
+    body = client.get(f'/api/subtitles/get/{upload}').get_json()
+    assert body['model'] == 'small'
+    assert 'refined' not in body
+
+
+def test_in_process_worker_refines_preview(app, client, upload, subtitle_services):
+    job_id = client.get(f'/api/subtitles/get/{upload}?preview=1').get_json()['refine_job_id']
+
+    worker = start_in_process_worker(app, ['transcribe'], poll_interval=0.05)
+    try:
+        deadline = time.monotonic() + 10
+        while client.get(f'/api/jobs/{job_id}').get_json()['status'] != DONE and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        worker.stop()
+    assert client.get(f'/api/jobs/{job_id}').get_json()['status'] == DONE
+    assert client.get(f'/api/subtitles/get/{upload}?preview=1').get_json()['refined'] is True
+
+
+def test_create_app_starts_in_process_worker(app, monkeypatch):
+    monkeypatch.setenv('MOVIE_SHORTS_INPROCESS_WORKER', 'transcribe')
+    worker_app = create_app()
+    worker = worker_app.extensions['in_process_worker']
+    worker.stop()
+    assert worker.kinds == ['transcribe']
+    assert 'in_process_worker' not in app.extensions
+
+
+def test_in_process_worker_detects_boundaries_by_default(monkeypatch):
+    monkeypatch.delenv('MOVIE_SHORTS_INPROCESS_WORKER', raising=False)
+    assert 'boundaries' in in_process_worker_kinds()
@@ -0,0 +1,118 @@
+import os
+import threading
+import pytest
+from app.utils.memory_budget import (MemoryBudget, process_tree_rss, estimate_encode, estimate_decode,
+                                     estimate_transcription)
+
+
+def run_in_thread(budget, nbytes, started, release):
+    def job():
+        with budget.reserve(nbytes):
+            started.set()
+            release.wait(5)
+    thread = threading.Thread(target=job)
+    thread.start()
+    return thread
+
+
+def test_reservations_that_fit_run_together():
+    budget = MemoryBudget(100)
+    with budget.reserve(60):
+        with budget.reserve(40):
+            assert budget.reserved == 100
+    assert budget.reserved == 0
+
+
+def test_reserve_blocks_until_memory_is_released():
+    budget = MemoryBudget(100)
+    first_started, first_release = threading.Event(), threading.Event()
+    second_started, second_release = threading.Event(), threading.Event()
+    first = run_in_thread(budget, 60, first_started, first_release)
+    assert first_started.wait(1)
+    second = run_in_thread(budget, 60, second_started, second_release)
+
+    assert not second_started.wait(0.1)
+    first_release.set()
+    assert second_started.wait(1)
+    assert budget.reserved == 60
+    second_release.set()
+    first.join()
+    second.join()
+    assert budget.reserved == 0
+
+
+def test_oversized_job_is_capped_and_runs_alone():
+    budget = MemoryBudget(100)
+    big_started, big_release = threading.Event(), threading.Event()
+    small_started, small_release = threading.Event(), threading.Event()
+    big = run_in_thread(budget, 500, big_started, big_release)
+    assert big_started.wait(1)
+    assert budget.reserved == 100
+
+    small = run_in_thread(budget, 1, small_started, small_release)
+    assert not small_started.wait(0.1)
+    big_release.set()
+    assert small_started.wait(1)
+    small_release.set()
+    big.join()
+    small.join()
+    assert budget.reserved == 0
+
+
+def test_oversized_job_waits_for_running_jobs():
+    budget = MemoryBudget(100)
+    small_started, small_release = threading.Event(), threading.Event()
+    big_started, big_release = threading.Event(), threading.Event()
+    small = run_in_thread(budget, 10, small_started, small_release)
+    assert small_started.wait(1)
+    big = run_in_thread(budget, 500, big_started, big_release)
+    assert not big_started.wait(0.1)
+    small_release.set()
+    assert big_started.wait(1)
+    big_release.set()
+    small.join()
+    big.join()
+
+
+def test_reservation_is_released_on_exception():
+    budget = MemoryBudget(100)
+    with pytest.raises(RuntimeError):
+        with budget.reserve(80):
+            raise RuntimeError('encode failed')
+    assert budget.reserved == 0
+    with budget.reserve(100):
+        pass
+
+
+def test_raising_the_limit_wakes_waiting_jobs():
+    budget = MemoryBudget(50)
+    first_started, first_release = threading.Event(), threading.Event()
+    second_started, second_release = threading.Event(), threading.Event()
+    first = run_in_thread(budget, 40, first_started, first_release)
+    assert first_started.wait(1)
+    second = run_in_thread(budget, 40, second_started, second_release)
+    assert not second_started.wait(0.1)
+    budget.set_limit(100)
+    assert second_started.wait(1)
+    first_release.set()
+    second_release.set()
+    first.join()
+    second.join()
+
+
+def test_estimates_scale_with_size():
+    assert estimate_encode(3840, 2160) > 4 * (estimate_encode(1920, 1080) - estimate_encode(0, 0))
+    assert estimate_decode(3840, 2160) < estimate_encode(3840, 2160)
+    assert estimate_transcription(7200) == 2 * estimate_transcription(3600)
+
+
+def test_process_tree_rss_counts_this_process():
+    before = process_tree_rss()
+    assert before > 0
+    if not os.path.exists(f'/proc/{os.getpid()}/statm'):
+        pytest.skip('current RSS is only available on Linux')
+    # Touch 64 MB so it becomes resident
+    block = bytearray(64 * 1024 * 1024)
+    for i in range(0, len(block), 4096):
+        block[i] = 1
+    assert process_tree_rss() >= before + 60 * 1024 * 1024
@@ -0,0 +1,83 @@
+"""
+Memory stress test: concurrent long jobs on a 4K source must keep the
+peak RSS of the process and its ffmpeg children under a configured limit.
+Slow; run with `python -m pytest app/tests/test_memory_stress.py --runslow`.
+"""
+
+import os
+import shutil
+import threading
+import time
+import pytest
+from app.utils import memory_budget
+from app.utils.memory_budget import MB, MemoryBudget, process_tree_rss
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MEDIA_DIR = os.path.join(BACKEND_DIR, 'benchmarks', '.media')
+
+# Peak RSS allowed for the whole process tree, and the (smaller) budget
+# the jobs are admitted under; the gap covers the app and untracked overhead
+RSS_LIMIT_MB = int(os.getenv('MOVIE_SHORTS_STRESS_RSS_LIMIT_MB', 2048))
+BUDGET_MB = int(os.getenv('MOVIE_SHORTS_STRESS_BUDGET_MB', 1024))
+JOBS = int(os.getenv('MOVIE_SHORTS_STRESS_JOBS', 4))
+# Whisper model (name or local directory) for the transcription jobs; unset skips them
+WHISPER_MODEL = os.getenv('MOVIE_SHORTS_STRESS_WHISPER_MODEL')
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which('ffmpeg') is None or shutil.which('ffprobe') is None,
+    reason='ffmpeg and ffprobe are required')
+
+
+@pytest.fixture
+def stress_source():
+    from benchmarks.media import STRESS_SPEC, synthesize
+    return synthesize(STRESS_SPEC, MEDIA_DIR)
+
+
+@pytest.mark.slow
+@requires_ffmpeg
+def test_concurrent_long_jobs_stay_under_rss_limit(stress_source, tmp_path, monkeypatch):
+    from app.utils.video_utils import cut_video, extract_subtitles, get_video_info, iter_srt
+    from app.utils.boundary_utils import detect_boundaries
+    from app.services.subtitle_service import SubtitleService
+
+    budget = MemoryBudget(BUDGET_MB * MB)
+    monkeypatch.setattr(memory_budget, '_memory_budget', budget)
+    service = SubtitleService(WHISPER_MODEL) if WHISPER_MODEL else None
+    if service:
+        # The model is loaded once per process, not per job
+        service.model
+    duration = get_video_info(stress_source)['duration']
+
+    def job(index):
+        job_dir = tmp_path / f"job{index}"
+        job_dir.mkdir()
+        start = (index * 60.0) % max(duration - 60.0, 1.0)
+        cut_video(stress_source, str(job_dir / 'cut.mp4'), start, start + 60.0, 'fast-preview')
+        # Decodes the whole source
+        detect_boundaries(stress_source)
+        subtitle_path = extract_subtitles(stress_source, os.path.basename(stress_source), str(job_dir))
+        assert sum(1 for _ in iter_srt(subtitle_path)) > 0
+        if service:
+            with service.transcribe(stress_source) as (segments, info):
+                for _ in segments:
+                    pass
+
+    errors = []
+    def guarded(index):
+        try:
+            job(index)
+        except Exception as e:
+            errors.append(e)
+
+    peak = process_tree_rss()
+    threads = [threading.Thread(target=guarded, args=(index,)) for index in range(JOBS)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        peak = max(peak, process_tree_rss())
+        time.sleep(0.05)
+
+    assert not errors, errors
+    assert budget.reserved == 0
+    assert peak <= RSS_LIMIT_MB * MB, f"peak RSS {peak / MB:.0f} MB over the {RSS_LIMIT_MB} MB limit"
@@ -0,0 +1,33 @@
+import time
+import threading
+from app.utils.metrics import timed, STAGE_SECONDS, server_timing_header
+
+
+def test_timed_records_elapsed():
+    with timed('test_block') as timer:
+        time.sleep(0.01)
+    assert timer.elapsed >= 0.01
+
+
+def test_timed_decorator_is_thread_safe():
+    @timed('test_decorated')
+    def work(seconds):
+        time.sleep(seconds)
+
+    slow = threading.Thread(target=work, args=(0.2,))
+    fast = threading.Thread(target=work, args=(0.01,))
+    slow.start()
+    time.sleep(0.05)
+    # Starts while the slow call is still running
+    fast.start()
+    slow.join()
+    fast.join()
+
+    # A shared timer would measure the slow call from the fast call's start
+    assert STAGE_SECONDS.count(stage='test_decorated') == 2
+    series = STAGE_SECONDS._series[(('stage', 'test_decorated'),)]
+    assert series['sum'] >= 0.2
+
+
+def test_server_timing_header():
+    assert server_timing_header([('probe', 0.0125), ('total', 0.5)]) == 'probe;dur=12.5, total;dur=500.0'
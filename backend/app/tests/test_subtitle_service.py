@@ -0,0 +1,91 @@
+import os
+import threading
+import pytest
+from app.services.subtitle_service import TranscriptionOptions
+
+
+def test_from_args_defaults():
+    options = TranscriptionOptions.from_args({})
+    assert options.as_dict() == TranscriptionOptions().as_dict()
+    assert options.language is None
+
+
+def test_from_args_parses_query_values():
+    options = TranscriptionOptions.from_args({
+        'transcribe_language': 'EN', 'beam_size': '3', 'condition_on_previous_text': 'false',
+        'vad_threshold': '0.6', 'words': 'yes'
+    })
+    assert options.language == 'en'
+    assert options.beam_size == 3
+    assert options.condition_on_previous_text is False
+    # Tuning a VAD parameter turns VAD on
+    assert options.vad_filter is True
+    assert options.vad_parameters == {'threshold': 0.6, 'min_silence_duration_ms': 2000, 'speech_pad_ms': 400}
+    assert options.word_timestamps is True
+
+
+@pytest.mark.parametrize('args', [{'beam_size': '0'}, {'beam_size': 'wide'}, {'vad_threshold': 'high'}])
+def test_from_args_rejects_bad_values(args):
+    with pytest.raises(ValueError):
+        TranscriptionOptions.from_args(args)
+
+
+@pytest.mark.parametrize('options', [
+    TranscriptionOptions(),
+    TranscriptionOptions(language='de', beam_size=1, condition_on_previous_text=False),
+    TranscriptionOptions(vad_filter=True, vad_parameters={'speech_pad_ms': 100}, word_timestamps=True),
+])
+def test_as_args_round_trip(options):
+    restored = TranscriptionOptions.from_args(options.as_args())
+    assert restored.as_dict() == options.as_dict()
+    assert restored.cache_key('small') == options.cache_key('small')
+
+
+def test_cache_key_depends_on_model_and_options():
+    options = TranscriptionOptions()
+    assert options.cache_key('small') == TranscriptionOptions().cache_key('small')
+    assert options.cache_key('small') != options.cache_key('tiny')
+    assert options.cache_key('small') != TranscriptionOptions(vad_filter=True).cache_key('small')
+    assert options.cache_key('small') != options.with_word_timestamps().cache_key('small')
+
+
+def test_transcribe_kwargs_omit_vad_parameters_without_vad():
+    assert 'vad_parameters' not in TranscriptionOptions().transcribe_kwargs()
+    assert 'vad_parameters' in TranscriptionOptions(vad_filter=True).transcribe_kwargs()
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    path.write_bytes(b'video')
+    return str(path)
+
+
+def test_transcribe_to_srt_caches_result(tmp_path, video, fake_subtitle_service):
+    service = fake_subtitle_service(texts=['one', 'two'])
+    srt_path, metadata, cached = service.transcribe_to_srt(video, str(tmp_path))
+    assert not cached
+    assert metadata['language'] == 'en'
+    with open(srt_path, encoding='utf-8') as f:
+        assert f.read() == ("1\n00:00:00,000 --> 00:00:01,500\none\n\n"
+                            "2\n00:00:02,000 --> 00:00:03,500\ntwo\n\n")
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+    assert service.transcribe_to_srt(video, str(tmp_path))[2] is True
+    assert service.calls == 1
+
+
+def test_concurrent_transcriptions_do_not_interleave(tmp_path, video, fake_subtitle_service):
+    texts = [f"cue {i}" for i in range(2000)]
+    services = [fake_subtitle_service(texts=texts) for _ in range(4)]
+    threads = [threading.Thread(target=service.transcribe_to_srt, args=(video, str(tmp_path)))
+               for service in services]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    srt_path, _, _ = services[0].transcript_paths(video, str(tmp_path))
+    with open(srt_path, encoding='utf-8') as f:
+        blocks = f.read().strip().split('\n\n')
+    assert [block.split('\n')[2] for block in blocks] == texts
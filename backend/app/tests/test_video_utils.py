@@ -0,0 +1,34 @@
+import pytest
+from app.utils import video_utils
+
+STREAMS = [
+    {'index': 0, 'codec_type': 'video', 'codec_name': 'h264'},
+    {'index': 2, 'codec_type': 'subtitle', 'codec_name': 'subrip', 'tags': {'language': 'ger'}},
+    {'index': 3, 'codec_type': 'subtitle', 'codec_name': 'subrip', 'tags': {'language': 'eng'},
+     'disposition': {'default': 1}},
+    {'index': 4, 'codec_type': 'subtitle', 'codec_name': 'hdmv_pgs_subtitle', 'tags': {'language': 'eng'}},
+    {'index': 5, 'codec_type': 'subtitle', 'codec_name': 'ass'},
+]
+
+
+@pytest.fixture
+def streams(monkeypatch):
+    monkeypatch.setattr(video_utils, 'probe_streams', lambda filepath: STREAMS)
+
+
+@pytest.mark.parametrize('tag, code', [
+    ('eng', 'en'), ('en', 'en'), ('EN', 'en'), ('en-US', 'en'),
+    ('ger', 'de'), ('deu', 'de'), ('und', 'und'),
+])
+def test_normalize_language(tag, code):
+    assert video_utils.normalize_language(tag) == code
+
+
+def test_text_streams_default_track_first(streams):
+    assert [s['index'] for s in video_utils.text_subtitle_streams('movie.mkv')] == [3, 2, 5]
+
+
+def test_text_streams_match_two_letter_codes(streams):
+    assert [s['index'] for s in video_utils.text_subtitle_streams('movie.mkv', ['en'])] == [3]
+    assert [s['index'] for s in video_utils.text_subtitle_streams('movie.mkv', ['de', 'eng'])] == [2, 3]
+    assert video_utils.text_subtitle_streams('movie.mkv', ['fr']) == []
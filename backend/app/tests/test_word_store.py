@@ -0,0 +1,60 @@
+import os
+from collections import namedtuple
+from app.utils.word_store import WordStoreWriter, WordTimeline, write_words, has_words
+
+Word = namedtuple('Word', 'start end word')
+Segment = namedtuple('Segment', 'words')
+
+WORDS = [(0.0, 0.5, ' Hello'), (0.5, 1.0, ' world'), (2.0, 2.5, ' héllo'), (2.5, 4.0, ' again')]
+
+
+def timeline(tmp_path, words=WORDS):
+    store_dir = str(tmp_path / 'clip.words')
+    write_words(iter(words), store_dir)
+    return WordTimeline(store_dir)
+
+
+def test_round_trip(tmp_path):
+    words = timeline(tmp_path)
+    assert len(words) == 4
+    assert [words.word(i) for i in range(4)] == ['Hello', 'world', 'héllo', 'again']
+
+
+def test_between_whole_range(tmp_path):
+    assert [w['text'] for w in timeline(tmp_path).between()] == ['Hello', 'world', 'héllo', 'again']
+
+
+def test_between_end_is_exclusive(tmp_path):
+    assert [w['text'] for w in timeline(tmp_path).between(0.0, 2.0)] == ['Hello', 'world']
+
+
+def test_between_includes_word_still_being_spoken(tmp_path):
+    assert [w['text'] for w in timeline(tmp_path).between(3.0, 10.0)] == ['again']
+
+
+def test_between_start_on_word_boundary(tmp_path):
+    # 'Hello' ends exactly where 'world' starts, so it is not included
+    assert [w['text'] for w in timeline(tmp_path).between(0.5, 1.0)] == ['world']
+
+
+def test_between_empty_ranges(tmp_path):
+    words = timeline(tmp_path)
+    assert words.between(1.2, 1.8) == []
+    assert words.between(10.0, 20.0) == []
+
+
+def test_empty_store(tmp_path):
+    words = timeline(tmp_path, [])
+    assert len(words) == 0
+    assert words.between() == []
+
+
+def test_writer_takes_whisper_segments(tmp_path):
+    writer = WordStoreWriter()
+    writer.add_segment(Segment([Word(0.0, 0.4, ' a'), Word(0.4, 0.9, ' b')]))
+    writer.add_segment(Segment(None))
+    store_dir = str(tmp_path / 'clip.words')
+    assert writer.save(store_dir) == 2
+    assert has_words(store_dir)
+    # No scratch directories are left behind
+    assert os.listdir(tmp_path) == ['clip.words']
@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+import urllib.request
+import pytest
+from app.config import storage_folders
+from app.services.job_queue import JobQueue, DONE, FAILED
+from app.worker import Worker, serve_metrics
+
+
+@pytest.fixture
+def worker(tmp_path):
+    return Worker(JobQueue(tmp_path / 'queue.sqlite3'), storage_folders(tmp_path), 'w1', lease_seconds=0.3)
+
+
+def test_missing_upload_fails_without_retry(worker):
+    job_id = worker.queue.enqueue('cut', {'filename': 'missing.mp4', 'startTime': 0, 'endTime': 1})
+    assert worker.run_once()
+    job = worker.queue.get(job_id)
+    assert (job['status'], job['attempts']) == (FAILED, 1)
+
+
+def test_heartbeat_survives_queue_errors(worker, monkeypatch):
+    job_id = worker.queue.enqueue('render', {'filename': 'a.mp4', 'sections': [{'start': 0, 'end': 1}]})
+    beats = []
+    heartbeat = worker.queue.heartbeat
+
+    def flaky_heartbeat(*args):
+        beats.append(args)
+        if len(beats) == 1:
+            raise sqlite3.OperationalError('database is locked')
+        return heartbeat(*args)
+    monkeypatch.setattr(worker.queue, 'heartbeat', flaky_heartbeat)
+
+    release = threading.Event()
+    def slow_cut(*args):
+        release.wait(1.0)
+        return 'cut.mp4'
+    monkeypatch.setattr(worker.media, 'cut', slow_cut)
+
+    worker.run_once()
+    assert len(beats) >= 2
+    assert worker.queue.get(job_id)['status'] == DONE
+
+
+def test_metrics_endpoint():
+    server = serve_metrics(0, host='127.0.0.1')
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            body = response.read().decode('utf-8')
+        assert '# TYPE movie_shorts_encode_fps histogram' in body
+    finally:
+        server.shutdown()
+        server.server_close()
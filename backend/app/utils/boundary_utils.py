@@ -0,0 +1,202 @@
+"""
+Boundary Utilities Module
+Finds natural cut points in a video (subtitle gaps, audio silences and
+scene changes) and snaps suggested section edges onto them.
+
+Silences and scene changes come from one ffmpeg pass per upload, run as a
+`boundaries` job by the workers, and are stored next to the other
+per-video artifacts as flat float32 arrays, so analyses only read a few
+kilobytes from disk.
+"""
+
+import os
+import re
+import bisect
+import logging
+import subprocess
+from array import array
+from .metrics import timed
+from .memory_budget import get_memory_budget, estimate_decode
+from .video_utils import first_stream
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Audio quieter than this for at least SILENCE_MIN_DURATION counts as silence
+SILENCE_NOISE_DB = -35
+SILENCE_MIN_DURATION = 0.3
+# Scene score (0-1) above which a frame starts a new shot
+SCENE_THRESHOLD = 0.3
+
+# How far (seconds) an edge may move, and how much each kind of cut point
+# is preferred over staying put
+DEFAULT_SNAP_WINDOW = 3.0
+CANDIDATE_WEIGHTS = {'silence': 1.0, 'subtitle_gap': 0.8, 'scene': 0.6}
+
+_SILENCE_START_RE = re.compile(r'silence_start:\s*(-?[\d.]+)')
+_SILENCE_END_RE = re.compile(r'silence_end:\s*(-?[\d.]+)')
+_SCENE_RE = re.compile(r'pts_time:\s*(-?[\d.]+)')
+
+
+def _sidecar_paths(filename, analysis_folder):
+    stem = os.path.splitext(filename)[0]
+    return (os.path.join(analysis_folder, f"{stem}.silence.f32"),
+            os.path.join(analysis_folder, f"{stem}.scenes.f32"))
+
+
+def _write_array(path, values):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        array('f', values).tofile(f)
+    os.replace(tmp_path, path)
+
+
+def _read_array(path):
+    values = array('f')
+    with open(path, 'rb') as f:
+        values.frombytes(f.read())
+    return values
+
+
+def detect_boundaries(filepath):
+    """
+    Run silence and scene detection over a video in a single ffmpeg pass.
+    Returns (silences, scenes): a flat [start, end, start, end, ...] list of
+    silent intervals and a sorted list of scene change timestamps.
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-nostats',
+        '-i', filepath,
+        # Scene scores are computed on a downscaled copy; shot changes don't
+        # need full resolution. Decoding still runs at the source resolution,
+        # so the pass reserves memory for full-size frames below
+        '-vf', f"scale=320:-2,select='gt(scene,{SCENE_THRESHOLD})',showinfo",
+        '-af', f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_DURATION}",
+        '-f', 'null', '-'
+    ]
+    video = first_stream(filepath, 'video') or {}
+    reservation = get_memory_budget().reserve(
+        estimate_decode(int(video.get('width', 0)), int(video.get('height', 0))),
+        f"boundary detection of {os.path.basename(filepath)}")
+    with reservation, timed('boundary_detect'):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Boundary detection failed: {result.stderr.strip()[-500:]}")
+
+    silences, scenes = [], []
+    silence_start = None
+    for line in result.stderr.splitlines():
+        if 'silencedetect' in line:
+            match = _SILENCE_START_RE.search(line)
+            if match:
+                silence_start = max(0.0, float(match.group(1)))
+                continue
+            match = _SILENCE_END_RE.search(line)
+            if match and silence_start is not None:
+                silences += [silence_start, float(match.group(1))]
+                silence_start = None
+        elif 'showinfo' in line:
+            match = _SCENE_RE.search(line)
+            if match:
+                scenes.append(float(match.group(1)))
+    return silences, sorted(scenes)
+
+
+def load_boundaries(filepath, filename, analysis_folder, detect=True):
+    """
+    Get the silence and scene arrays for a video, detecting them on first use.
+    Cached arrays are reused while they are newer than the video; with
+    detect=False, (None, None) is returned instead of running detection.
+    """
+    silence_path, scenes_path = _sidecar_paths(filename, analysis_folder)
+    source_mtime = os.path.getmtime(filepath)
+    if all(os.path.exists(path) and os.path.getmtime(path) >= source_mtime
+           for path in (silence_path, scenes_path)):
+        return _read_array(silence_path), _read_array(scenes_path)
+    if not detect:
+        return None, None
+
+    silences, scenes = detect_boundaries(filepath)
+    os.makedirs(analysis_folder, exist_ok=True)
+    _write_array(silence_path, silences)
+    _write_array(scenes_path, scenes)
+    logger.info(f"Detected {len(silences) // 2} silences and {len(scenes)} scene changes in {filename}")
+    return array('f', silences), array('f', scenes)
+
+
+class BoundaryIndex:
+    """
+    Sorted cut-point indexes for one video.
+    Lookups are binary searches, so snapping every suggested section costs
+    O(log n) per edge regardless of how long the film is.
+    """
+
+    def __init__(self, subtitles=None, silences=None, scenes=None):
+        subtitles = sorted(subtitles or [], key=lambda subtitle: subtitle['start'])
+
+        # Midpoints of the gaps between consecutive cues, plus the time
+        # before the first cue
+        gaps = [subtitles[0]['start'] / 2] if subtitles else []
+        for previous, current in zip(subtitles, subtitles[1:]):
+            if current['start'] >= previous['end']:
+                gaps.append((previous['end'] + current['start']) / 2)
+        self.subtitle_gaps = array('f', sorted(gaps))
+
+        silences = silences or []
+        intervals = sorted(zip(silences[0::2], silences[1::2]))
+        self.silence_starts = array('f', (start for start, _ in intervals))
+        self.silence_ends = array('f', (end for _, end in intervals))
+        self.silence_mids = array('f', sorted((start + end) / 2 for start, end in intervals))
+        self.scenes = array('f', sorted(scenes or []))
+
+    def in_silence(self, t):
+        """Check whether t falls inside a detected silence"""
+        i = bisect.bisect_right(self.silence_starts, t) - 1
+        return i >= 0 and t <= self.silence_ends[i]
+
+    @staticmethod
+    def _within(points, lo, hi):
+        return points[bisect.bisect_left(points, lo):bisect.bisect_right(points, hi)]
+
+    def snap(self, t, window=DEFAULT_SNAP_WINDOW, lo=None, hi=None):
+        """
+        Move t to the best nearby cut point.
+        Candidates within `window` seconds (and inside [lo, hi] when given)
+        are scored by kind, with a bonus for landing inside a silence and a
+        penalty for distance. Returns (time, kind), with kind None if t is kept.
+        """
+        lo = t - window if lo is None else max(lo, t - window)
+        hi = t + window if hi is None else min(hi, t + window)
+        best_time, best_kind, best_score = t, None, 0.0
+        for kind, points in (('silence', self.silence_mids),
+                             ('subtitle_gap', self.subtitle_gaps),
+                             ('scene', self.scenes)):
+            for candidate in self._within(points, lo, hi):
+                score = CANDIDATE_WEIGHTS[kind] - abs(candidate - t) / window * 0.5
+                if kind != 'silence' and self.in_silence(candidate):
+                    score += 0.3
+                if score > best_score:
+                    best_time, best_kind, best_score = float(candidate), kind, score
+        return best_time, best_kind
+
+
+def refine_sections(sections, index, window=DEFAULT_SNAP_WINDOW, min_length=1.0):
+    """
+    Snap the start and end of each section onto nearby cut points.
+    The original edges are kept under 'original_start'/'original_end' and
+    the kind of cut point used is reported in 'snapped'.
+    """
+    refined = []
+    for section in sections:
+        start, end = float(section['start']), float(section['end'])
+        new_start, start_kind = index.snap(start, window, lo=0.0, hi=end - min_length)
+        new_end, end_kind = index.snap(end, window, lo=new_start + min_length)
+        refined.append({
+            **section,
+            'start': round(new_start, 3),
+            'end': round(new_end, 3),
+            'original_start': start,
+            'original_end': end,
+            'snapped': {'start': start_kind, 'end': end_kind}
+        })
+    return refined
@@ -0,0 +1,130 @@
+"""
+Encoder Profiles Module
+Named encoder settings for cuts, plus thread and preset selection that
+adapts to the machine the encode runs on.
+
+Profiles are plain dictionaries:
+    video_codec    ffmpeg video encoder
+    preset         speed/size trade-off for x264/x265 (None for others)
+    crf            constant rate factor; lower is better quality, bigger files
+    audio_codec    encoder used when the source audio can't be copied
+    audio_bitrate  bitrate for transcoded audio
+    copy_audio     source audio codecs that are stream-copied as-is
+    container      output file extension
+    extra          additional encoder arguments
+"""
+
+import os
+import math
+import logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+ENCODER_PROFILES = {
+    # Quick look at a cut; favours encode speed over size
+    'fast-preview': {
+        'video_codec': 'libx264', 'preset': 'veryfast', 'crf': 28,
+        'audio_codec': 'aac', 'audio_bitrate': '96k', 'copy_audio': {'aac', 'mp3'},
+        'container': 'mp4', 'extra': ['-movflags', '+faststart'],
+    },
+    # Final shorts; a fraction of the size of ultrafast at similar quality
+    'balanced': {
+        'video_codec': 'libx264', 'preset': 'fast', 'crf': 23,
+        'audio_codec': 'aac', 'audio_bitrate': '128k', 'copy_audio': {'aac', 'mp3'},
+        'container': 'mp4', 'extra': ['-movflags', '+faststart'],
+    },
+    # Long-term storage; HEVC at a slow preset for the smallest files
+    'archive': {
+        'video_codec': 'libx265', 'preset': 'slow', 'crf': 24,
+        'audio_codec': 'aac', 'audio_bitrate': '160k', 'copy_audio': {'aac', 'ac3', 'eac3', 'mp3'},
+        'container': 'mp4', 'extra': ['-tag:v', 'hvc1', '-movflags', '+faststart'],
+    },
+    # Royalty-free web delivery
+    'web-vp9': {
+        'video_codec': 'libvpx-vp9', 'preset': None, 'crf': 33,
+        'audio_codec': 'libopus', 'audio_bitrate': '96k', 'copy_audio': {'opus', 'vorbis'},
+        'container': 'webm', 'extra': ['-b:v', '0', '-row-mt', '1', '-deadline', 'good', '-cpu-used', '2'],
+    },
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+# x264/x265 presets from fastest to slowest
+PRESET_LADDER = ['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow']
+
+
+def get_profile(name=None):
+    """Look up an encoder profile by name; raises ValueError for unknown names"""
+    name = name or DEFAULT_PROFILE
+    if name not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile '{name}'. Available: {', '.join(ENCODER_PROFILES)}")
+    return ENCODER_PROFILES[name]
+
+
+def available_cores():
+    """Number of CPU cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def current_load():
+    """One-minute load average, or 0 where it isn't available"""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return 0.0
+
+
+def select_threads(cores=None, load=None):
+    """
+    Pick an encoder thread count from the cores that are currently idle.
+    Concurrent cuts then share the machine instead of each assuming it
+    owns every core.
+    """
+    cores = cores or available_cores()
+    load = current_load() if load is None else load
+    return max(1, min(cores, round(cores - load)))
+
+
+def select_preset(preset, cores=None, load=None):
+    """
+    Step the profile's preset one notch faster per unit of load above the
+    core count, so a saturated box keeps up rather than queueing encodes.
+    """
+    if preset not in PRESET_LADDER:
+        return preset
+    cores = cores or available_cores()
+    load = current_load() if load is None else load
+    steps = math.ceil(load / cores - 1) if load > cores else 0
+    index = max(0, PRESET_LADDER.index(preset) - steps)
+    if steps:
+        logger.info(f"Load {load:.1f} on {cores} cores; using preset '{PRESET_LADDER[index]}' instead of '{preset}'")
+    return PRESET_LADDER[index]
+
+
+def build_encode_command(input_path, output_path, start_time, duration, profile, audio_codec=None):
+    """
+    Build the ffmpeg command that cuts [start_time, start_time + duration]
+    with an encoder profile. audio_codec is the source's audio codec: it is
+    stream-copied when the profile allows, otherwise transcoded.
+    """
+    cores, load = available_cores(), current_load()
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        # Seeking before -i jumps straight to the nearest keyframe; the
+        # re-encode then makes the cut frame-accurate
+        '-ss', f"{start_time:.3f}", '-i', input_path, '-t', f"{duration:.3f}",
+        '-map', '0:v:0', '-map', '0:a:0?',
+        '-c:v', profile['video_codec'], '-crf', str(profile['crf']), '-pix_fmt', 'yuv420p',
+        '-threads', str(select_threads(cores, load)),
+    ]
+    if profile['preset']:
+        cmd += ['-preset', select_preset(profile['preset'], cores, load)]
+    if audio_codec in profile['copy_audio']:
+        cmd += ['-c:a', 'copy']
+    else:
+        cmd += ['-c:a', profile['audio_codec'], '-b:a', profile['audio_bitrate']]
+    cmd += profile['extra'] + [output_path]
+    return cmd
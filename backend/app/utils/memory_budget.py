@@ -0,0 +1,185 @@
+"""
+Memory Budget Module
+Per-process admission control for memory-heavy media work.
+
+Transcriptions, encodes and boundary detection reserve an estimate of the memory they need
+before they start. A job that doesn't fit in the budget next to the
+running ones waits until they release their reservations, so a burst of
+4K or multi-hour jobs queues up instead of getting the process
+OOM-killed. The budget defaults to half the memory available to the
+process (its cgroup limit or physical RAM); MOVIE_SHORTS_MEMORY_LIMIT_MB
+sets it explicitly.
+"""
+
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from ..config import MEMORY_LIMIT_MB
+from .metrics import timed
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Whisper holds the whole track as 16 kHz float32 samples plus a log-mel
+# spectrogram of up to 128 bands at 100 frames a second
+TRANSCRIBE_BYTES_PER_SECOND = 16000 * 4 + 128 * 100 * 4
+
+# Frames x264/x265 keep in flight (lookahead, references, frame threads),
+# and what an ffmpeg process needs before it holds any frames
+ENCODE_FRAMES_IN_FLIGHT = 64
+FFMPEG_BASE_BYTES = 64 * MB
+
+# Decoded frames an ffmpeg analysis pass holds (frame threads plus filter queues)
+DECODE_FRAMES_IN_FLIGHT = 16
+
+# Used when the machine's memory can't be determined
+FALLBACK_LIMIT_BYTES = 2048 * MB
+
+try:
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):
+    PAGE_SIZE = 4096
+
+
+def available_memory():
+    """Memory this process may use: its cgroup limit if lower than physical RAM, or None if unknown"""
+    try:
+        limit = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        limit = None
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path, 'r') as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # 'max' (v2) or a huge number (v1) means no limit
+        if value.isdigit() and (limit is None or int(value) < limit):
+            limit = int(value)
+    return limit
+
+
+def default_limit():
+    """Budget in bytes from MOVIE_SHORTS_MEMORY_LIMIT_MB, else half the available memory"""
+    if MEMORY_LIMIT_MB:
+        return MEMORY_LIMIT_MB * MB
+    available = available_memory()
+    return available // 2 if available else FALLBACK_LIMIT_BYTES
+
+
+def estimate_transcription(duration):
+    """Bytes needed to transcribe duration seconds of audio, excluding the model itself"""
+    return int(duration * TRANSCRIBE_BYTES_PER_SECOND)
+
+
+def estimate_encode(width, height):
+    """Bytes an ffmpeg encode of width x height yuv420p video needs"""
+    return FFMPEG_BASE_BYTES + int(width * height * 1.5) * ENCODE_FRAMES_IN_FLIGHT
+
+
+def estimate_decode(width, height):
+    """Bytes an ffmpeg pass that decodes width x height video without encoding needs"""
+    return FFMPEG_BASE_BYTES + int(width * height * 1.5) * DECODE_FRAMES_IN_FLIGHT
+
+
+def _read_rss(pid):
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # The process exited while we were looking
+        return 0
+
+
+def _child_pids(pid):
+    children = []
+    try:
+        tasks = os.listdir(f'/proc/{pid}/task')
+    except OSError:
+        return children
+    for tid in tasks:
+        try:
+            with open(f'/proc/{pid}/task/{tid}/children', 'r') as f:
+                children.extend(int(child) for child in f.read().split())
+        except OSError:
+            continue
+    return children
+
+
+def process_tree_rss(pid=None):
+    """
+    Resident memory in bytes of a process and all its descendants, so the
+    ffmpeg children of a job count too. Outside Linux this falls back to
+    the peak RSS of the current process alone.
+    """
+    pid = pid or os.getpid()
+    if not os.path.exists(f'/proc/{pid}/statm'):
+        import resource
+        # ru_maxrss is in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == 'Darwin' else peak * 1024
+
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        total += _read_rss(current)
+        pending.extend(_child_pids(current))
+    return total
+
+
+class MemoryBudget:
+    """
+    Reservation-based memory budget shared by every thread of a process.
+    A reservation larger than the whole budget is capped to it, so an
+    oversized job still runs, just on its own.
+    """
+
+    def __init__(self, limit_bytes):
+        self.limit = limit_bytes
+        self.reserved = 0
+        self._cond = threading.Condition()
+
+    def set_limit(self, limit_bytes):
+        """Change the budget; waiting jobs are re-checked against the new limit"""
+        with self._cond:
+            self.limit = limit_bytes
+            self._cond.notify_all()
+
+    @contextmanager
+    def reserve(self, nbytes, label='job'):
+        """Block until nbytes fit in the budget and hold them for the duration of the block"""
+        def fits():
+            return self.reserved + min(nbytes, self.limit) <= self.limit
+
+        with timed('admission'):
+            with self._cond:
+                if not fits():
+                    logger.info(f"Waiting for memory to start {label}: needs {nbytes // MB} MB, "
+                                f"{self.reserved // MB} of {self.limit // MB} MB reserved")
+                self._cond.wait_for(fits)
+                # The limit may have changed while waiting
+                held = min(nbytes, self.limit)
+                self.reserved += held
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.reserved -= held
+                self._cond.notify_all()
+
+
+_memory_budget = None
+_memory_budget_lock = threading.Lock()
+
+def get_memory_budget():
+    """Return the process-wide MemoryBudget, creating it on first use."""
+    global _memory_budget
+    if _memory_budget is None:
+        with _memory_budget_lock:
+            if _memory_budget is None:
+                _memory_budget = MemoryBudget(default_limit())
+                logger.info(f"Memory budget for media jobs: {_memory_budget.limit // MB} MB")
+    return _memory_budget
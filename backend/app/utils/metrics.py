@@ -0,0 +1,229 @@
+"""
+Metrics Module
+Lightweight timing and metrics layer for the media pipeline.
+
+Stages are timed with ``timed()`` (usable as a context manager or a
+decorator) and recorded as Prometheus-style histograms. ``init_app()``
+exposes everything on ``/metrics`` and adds a ``Server-Timing`` header
+to each response listing the stages that ran during that request.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from contextlib import ContextDecorator
+
+from flask import Response, g, has_request_context, request
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Buckets in seconds, covering quick probes up to multi-minute transcriptions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RATIO_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32, 64)
+FPS_BUCKETS = (1, 5, 10, 25, 50, 100, 200, 400, 800)
+THROUGHPUT_BUCKETS = (1e6, 5e6, 10e6, 25e6, 50e6, 100e6, 250e6, 500e6, 1e9)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    parts = [f'{k}="{str(v)}"' for k, v in sorted(labels)]
+    return '{' + ','.join(parts) + '}'
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative histogram with fixed buckets, optionally split by labels."""
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def count(self, **labels):
+        series = self._series.get(tuple(sorted(labels.items())))
+        return series['count'] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, series['counts']):
+                    cumulative += bucket_count
+                    labels = _format_labels(key + (('le', f"{bound:g}"),))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(key + (('le', '+Inf'),))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together on /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'movie_shorts_stage_seconds', 'Time spent in each pipeline stage.'))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    'movie_shorts_stage_errors_total', 'Pipeline stages that raised an exception.'))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'movie_shorts_request_seconds', 'HTTP request latency by endpoint.'))
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    'movie_shorts_requests_total', 'HTTP requests by endpoint and status code.'))
+TRANSCRIBE_REALTIME_FACTOR = REGISTRY.register(Histogram(
+    'movie_shorts_transcribe_realtime_factor', 'Seconds of audio transcribed per second of wall time.',
+    buckets=RATIO_BUCKETS))
+TRANSCRIBED_AUDIO_SECONDS = REGISTRY.register(Counter(
+    'movie_shorts_transcribed_audio_seconds_total', 'Seconds of audio transcribed by Whisper.'))
+ENCODE_FPS = REGISTRY.register(Histogram(
+    'movie_shorts_encode_fps', 'Frames encoded per second of wall time.', buckets=FPS_BUCKETS))
+ENCODED_FRAMES = REGISTRY.register(Counter(
+    'movie_shorts_encoded_frames_total', 'Frames written by the encoder.'))
+UPLOAD_BYTES = REGISTRY.register(Counter(
+    'movie_shorts_upload_bytes_total', 'Bytes written to storage by uploads.'))
+UPLOAD_THROUGHPUT = REGISTRY.register(Histogram(
+    'movie_shorts_upload_throughput_bytes_per_second', 'Upload write throughput.',
+    buckets=THROUGHPUT_BUCKETS))
+
+
+class timed(ContextDecorator):
+    """
+    Time a pipeline stage.
+
+    Records the elapsed time in the stage histogram and, inside a request,
+    in that request's Server-Timing header. The elapsed time is available
+    as ``.elapsed`` once the block exits.
+    """
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.elapsed = 0.0
+
+    def _recreate_cm(self):
+        # As a decorator, every call gets its own timer so concurrent
+        # calls don't overwrite each other's start time
+        return timed(self.stage)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self._start
+        STAGE_SECONDS.observe(self.elapsed, stage=self.stage)
+        if exc_type is not None:
+            STAGE_ERRORS.inc(stage=self.stage)
+        if has_request_context():
+            g.setdefault('server_timings', []).append((self.stage, self.elapsed))
+        return False
+
+
+def record_transcription(audio_seconds, elapsed):
+    """Record the realtime factor of a Whisper transcription."""
+    TRANSCRIBED_AUDIO_SECONDS.inc(audio_seconds)
+    if elapsed > 0:
+        TRANSCRIBE_REALTIME_FACTOR.observe(audio_seconds / elapsed)
+        logger.info(f"Transcribed {audio_seconds:.1f}s of audio in {elapsed:.1f}s "
+                    f"({audio_seconds / elapsed:.2f}x realtime)")
+
+
+def record_encode(frames, elapsed):
+    """Record encoder throughput in frames per second."""
+    ENCODED_FRAMES.inc(frames)
+    if elapsed > 0:
+        ENCODE_FPS.observe(frames / elapsed)
+        logger.info(f"Encoded {frames} frames in {elapsed:.1f}s ({frames / elapsed:.1f} fps)")
+
+
+def record_upload(num_bytes, elapsed):
+    """Record upload write throughput in bytes per second."""
+    UPLOAD_BYTES.inc(num_bytes)
+    if elapsed > 0:
+        UPLOAD_THROUGHPUT.observe(num_bytes / elapsed)
+
+
+def server_timing_header(timings):
+    """Format (stage, seconds) pairs as a Server-Timing header value."""
+    return ', '.join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings)
+
+
+def init_app(app):
+    """Register the /metrics endpoint and per-request timing hooks."""
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get('request_start')
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or 'unknown'
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint)
+        REQUESTS_TOTAL.inc(endpoint=endpoint, status=response.status_code)
+        timings = g.get('server_timings', []) + [('total', elapsed)]
+        response.headers['Server-Timing'] = server_timing_header(timings)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
@@ -1,10 +1,16 @@
 import os
+import uuid
+import tempfile
+import functools
+import itertools
 from pathlib import Path
 import subprocess
 import json
 import logging
-from moviepy.video.io.VideoFileClip import VideoFileClip
 import traceback
+from .metrics import timed, record_encode
+from .encoder_profiles import get_profile, build_encode_command
+from .memory_budget import get_memory_budget, estimate_encode
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -34,34 +40,101 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 def get_video_info(filepath):
-    """Get video metadata"""
+    """
+    Get video metadata from the (cached) ffprobe results.
+    Nothing is decoded, so this costs the same for a multi-hour 4K source
+    as for a short clip.
+    """
     try:
-        with VideoFileClip(filepath) as clip:
-            return {
-                'duration': clip.duration,
-                'fps': clip.fps,
-                'size': (clip.w, clip.h)
-            }
+        video = first_stream(filepath, 'video')
+        if video is None:
+            raise ValueError('No video stream found')
+        width, height = int(video['width']), int(video['height'])
+        # Phones store portrait video as rotated landscape frames
+        rotation = video.get('tags', {}).get('rotate') or next(
+            (data['rotation'] for data in video.get('side_data_list', []) if 'rotation' in data), 0)
+        if abs(int(float(rotation))) % 180 == 90:
+            width, height = height, width
+        return {
+            'duration': float(probe_media(filepath)['format'].get('duration') or video.get('duration') or 0),
+            'fps': parse_frame_rate(video.get('avg_frame_rate')) or parse_frame_rate(video.get('r_frame_rate')),
+            'size': (width, height)
+        }
     except Exception as e:
         logger.error(f"Error getting video info: {str(e)}")
         logger.error(traceback.format_exc())
         raise
 
+# Subtitle codecs ffmpeg can convert to SRT; bitmap formats such as PGS or
+# DVD subtitles need OCR and are skipped
+TEXT_SUBTITLE_CODECS = {
+    'subrip', 'srt', 'ass', 'ssa', 'mov_text', 'webvtt', 'text',
+    'microdvd', 'subviewer', 'subviewer1', 'jacosub', 'realtext', 'sami', 'stl'
+}
+
+@functools.lru_cache(maxsize=256)
+def _probe_media(filepath, mtime_ns, size):
+    cmd = [
+        'ffprobe',
+        '-v', 'quiet',
+        '-print_format', 'json',
+        '-show_streams',
+        '-show_format',
+        filepath
+    ]
+    with timed('probe'):
+        result = subprocess.run(cmd, capture_output=True, text=True)
+    data = json.loads(result.stdout)
+    return {'streams': tuple(data.get('streams', [])), 'format': data.get('format', {})}
+
+def probe_media(filepath):
+    """
+    Get ffprobe's stream and container information for a media file.
+    Results are cached per path, size and modification time, so repeated
+    checks on the same upload only run ffprobe once.
+    """
+    stat = os.stat(filepath)
+    return _probe_media(os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size)
+
+def probe_streams(filepath):
+    """Get the (cached) ffprobe stream list for a media file"""
+    return probe_media(filepath)['streams']
+
+def first_stream(filepath, codec_type):
+    """Get the first stream of a type ('video', 'audio', ...), or None"""
+    return next((stream for stream in probe_streams(filepath) if stream.get('codec_type') == codec_type), None)
+
+def parse_frame_rate(rate):
+    """Convert an ffprobe rate such as '30000/1001' to a float"""
+    num, _, den = (rate or '0/1').partition('/')
+    return float(num) / float(den or 1) if float(den or 1) else 0.0
+
+# ISO 639-2 codes (bibliographic and terminologic) that ffprobe reports,
+# mapped to the ISO 639-1 codes Whisper and browsers use
+ISO_639_2_TO_1 = {
+    'ara': 'ar', 'chi': 'zh', 'zho': 'zh', 'cze': 'cs', 'ces': 'cs', 'dan': 'da',
+    'dut': 'nl', 'nld': 'nl', 'eng': 'en', 'fin': 'fi', 'fre': 'fr', 'fra': 'fr',
+    'ger': 'de', 'deu': 'de', 'gre': 'el', 'ell': 'el', 'heb': 'he', 'hin': 'hi',
+    'hun': 'hu', 'ind': 'id', 'ita': 'it', 'jpn': 'ja', 'kor': 'ko', 'nor': 'no',
+    'nob': 'nb', 'per': 'fa', 'fas': 'fa', 'pol': 'pl', 'por': 'pt', 'rum': 'ro',
+    'ron': 'ro', 'rus': 'ru', 'spa': 'es', 'swe': 'sv', 'tha': 'th', 'tur': 'tr',
+    'ukr': 'uk', 'vie': 'vi',
+}
+
+def normalize_language(language):
+    """Reduce a language tag ('eng', 'ger', 'en-US', 'EN') to a comparable code ('en', 'de')"""
+    code = language.strip().lower().replace('_', '-').split('-')[0]
+    return ISO_639_2_TO_1.get(code, code)
+
+def stream_language(stream):
+    """Get the language tag of a stream, 'und' when it is not tagged"""
+    return stream.get('tags', {}).get('language', 'und').lower()
+
 def check_subtitles(filepath):
     """Check if video has embedded subtitles"""
     try:
-        cmd = [
-            'ffprobe',
-            '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_streams',
-            filepath
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        data = json.loads(result.stdout)
-        
         subtitle_streams = [
-            stream for stream in data.get('streams', [])
+            stream for stream in probe_streams(filepath)
             if stream.get('codec_type') == 'subtitle'
         ]
         
@@ -70,27 +143,153 @@ def check_subtitles(filepath):
         logger.error(f"Error checking subtitles: {str(e)}")
         return False
 
-def extract_subtitles(filepath, filename, subtitles_folder):
-    """Extract embedded subtitles from video"""
+def text_subtitle_streams(filepath, languages=None):
+    """
+    List embedded subtitle streams that can be converted to SRT.
+    If languages is given, only streams tagged with one of those languages
+    are returned, in the order the languages were requested. ISO 639-1 and
+    639-2 codes match each other, so 'en' finds a stream tagged 'eng'.
+    """
+    streams = [
+        stream for stream in probe_streams(filepath)
+        if stream.get('codec_type') == 'subtitle' and stream.get('codec_name') in TEXT_SUBTITLE_CODECS
+    ]
+    if languages:
+        languages = [normalize_language(language) for language in languages]
+        streams = [stream for stream in streams
+                   if normalize_language(stream_language(stream)) in languages]
+        streams.sort(key=lambda stream: languages.index(normalize_language(stream_language(stream))))
+    else:
+        # Put the track flagged as default first
+        streams.sort(key=lambda stream: -stream.get('disposition', {}).get('default', 0))
+    return streams
+
+def _is_cached(output_path, source_mtime):
+    return (os.path.exists(output_path) and os.path.getsize(output_path) > 0
+            and os.path.getmtime(output_path) >= source_mtime)
+
+def extract_subtitle_tracks(filepath, filename, subtitles_folder, languages=None):
+    """
+    Extract embedded text subtitle tracks to SRT files.
+    All matching tracks are written in a single ffmpeg pass; tracks already
+    extracted from the current version of the file are reused, and ffmpeg
+    is not run at all when the file has no text subtitle streams.
+    Returns a list of {'stream_index', 'language', 'codec', 'path'} dictionaries.
+    """
+    streams = text_subtitle_streams(filepath, languages)
+    if not streams:
+        return []
+    
+    stem = os.path.splitext(filename)[0]
+    source_mtime = os.path.getmtime(filepath)
+    tracks = []
+    cmd = ['ffmpeg', '-y', '-v', 'error', '-i', filepath]
+    pending = 0
+    for stream in streams:
+        language = stream_language(stream)
+        subtitle_path = os.path.join(subtitles_folder, f"{stem}.{stream['index']}.{language}.srt")
+        tracks.append({
+            'stream_index': stream['index'],
+            'language': language,
+            'codec': stream.get('codec_name'),
+            'path': subtitle_path
+        })
+        if not _is_cached(subtitle_path, source_mtime):
+            cmd += ['-map', f"0:{stream['index']}", '-c:s', 'srt', subtitle_path]
+            pending += 1
+    
+    if pending:
+        with timed('subtitle_extract'):
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            logger.error(f"ffmpeg subtitle extraction failed: {result.stderr.strip()}")
+    
+    return [
+        track for track in tracks
+        if os.path.exists(track['path']) and os.path.getsize(track['path']) > 0
+    ]
+
+def extract_subtitles(filepath, filename, subtitles_folder, language=None):
+    """Extract embedded subtitles from video, returning the preferred track's SRT path"""
     try:
-        subtitle_path = os.path.join(subtitles_folder, f"{os.path.splitext(filename)[0]}.srt")
-        
-        cmd = [
-            'ffmpeg',
-            '-i', filepath,
-            '-map', '0:s:0',
-            subtitle_path
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if os.path.exists(subtitle_path) and os.path.getsize(subtitle_path) > 0:
-            return subtitle_path
+        tracks = extract_subtitle_tracks(filepath, filename, subtitles_folder,
+                                         [language] if language else None)
+        if tracks:
+            return tracks[0]['path']
         return None
     except Exception as e:
         logger.error(f"Error extracting subtitles: {str(e)}")
         return None
 
+def cut_filename_for(filename, profile_name=None):
+    """Generate a unique output filename for a cut with an encoder profile"""
+    stem = os.path.splitext(filename)[0]
+    return f"cut_{uuid.uuid4().hex[:8]}_{stem}.{get_profile(profile_name)['container']}"
+
+def cut_video(input_path, output_path, start_time, end_time, profile_name=None):
+    """
+    Cut [start_time, end_time] out of a video and encode it to output_path
+    with a named encoder profile.
+    Each cut encodes inside its own temporary directory and is moved into
+    place when complete, so concurrent cuts never share scratch files and
+    a half-written cut is never served.
+    Raises ValueError for an invalid time range or unknown profile.
+    """
+    profile = get_profile(profile_name)
+    media = probe_media(input_path)
+    duration = float(media['format'].get('duration', 0))
+    if start_time < 0 or end_time > duration or start_time >= end_time:
+        raise ValueError('Invalid time range')
+    
+    audio = first_stream(input_path, 'audio')
+    video = first_stream(input_path, 'video') or {}
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    reservation = get_memory_budget().reserve(
+        estimate_encode(int(video.get('width', 0)), int(video.get('height', 0))),
+        f"cut of {os.path.basename(input_path)}")
+    with reservation, tempfile.TemporaryDirectory(prefix='cut-', dir=output_dir) as job_dir:
+        tmp_path = os.path.join(job_dir, os.path.basename(output_path))
+        cmd = build_encode_command(input_path, tmp_path, start_time, end_time - start_time,
+                                   profile, audio.get('codec_name') if audio else None)
+        with timed('encode') as timer:
+            result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg encode failed: {result.stderr.strip()[-500:]}")
+        os.replace(tmp_path, output_path)
+    
+    fps = parse_frame_rate(video.get('avg_frame_rate'))
+    record_encode(int((end_time - start_time) * fps), timer.elapsed)
+    return output_path
+
 def timestamp_to_seconds(timestamp):
     """Convert SRT timestamp to seconds"""
     h, m, s = timestamp.replace(',', '.').split(':')
-    return int(h) * 3600 + int(m) * 60 + float(s) 
\ No newline at end of file
+    return int(h) * 3600 + int(m) * 60 + float(s) 
+
+def iter_srt(subtitle_path):
+    """
+    Yield the cues of an SRT file as {'start', 'end', 'text'} dictionaries.
+    The file is read line by line, so only one cue is in memory at a time.
+    """
+    with open(subtitle_path, 'r', encoding='utf-8') as f:
+        lines = []
+        # A trailing blank line flushes the last cue
+        for line in itertools.chain(f, ['']):
+            line = line.strip()
+            if line:
+                lines.append(line)
+                continue
+            if len(lines) >= 3:
+                # Parse timestamp line
+                start_time, end_time = lines[1].split(' --> ')
+                
+                yield {
+                    'start': timestamp_to_seconds(start_time),
+                    'end': timestamp_to_seconds(end_time),
+                    'text': ' '.join(lines[2:])
+                }
+            lines = []
+
+def parse_srt(subtitle_path):
+    """Parse an SRT file into a list of {'start', 'end', 'text'} dictionaries"""
+    return list(iter_srt(subtitle_path))
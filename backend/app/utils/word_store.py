@@ -0,0 +1,133 @@
+"""
+Word Store Module
+Compact, memory-mappable storage for word-level transcript timings.
+
+A store is a directory holding four flat files:
+    starts.npy   float32 word start times, sorted
+    ends.npy     float32 word end times
+    offsets.npy  uint32 byte offsets into text.bin (one more than the word count)
+    text.bin     UTF-8 text of all words, concatenated
+
+Tens of thousands of words take a few hundred kilobytes, and lookups only
+touch the pages they need instead of loading a JSON list of dicts.
+"""
+
+import os
+import shutil
+import logging
+import tempfile
+from array import array
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+STORE_FILES = ('starts.npy', 'ends.npy', 'offsets.npy', 'text.bin')
+
+
+class WordStoreWriter:
+    """
+    Collects words straight into the store's flat arrays as they arrive,
+    so a transcript's words are never held as Python objects.
+    """
+
+    def __init__(self):
+        self.starts, self.ends, self.offsets = array('f'), array('f'), array('I', [0])
+        self.text = bytearray()
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end, word):
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text += word.strip().encode('utf-8')
+        self.offsets.append(len(self.text))
+
+    def add_segment(self, segment):
+        """Add the words of a Whisper segment transcribed with word timestamps"""
+        for start, end, word in segment_words([segment]):
+            self.add(start, end, word)
+
+    def save(self, store_dir):
+        """Write the store, swapping it in atomically; returns the word count"""
+        import numpy as np
+
+        parent = os.path.dirname(os.path.abspath(store_dir))
+        # A private scratch directory, so concurrent writers never share one
+        tmp_dir = tempfile.mkdtemp(prefix=f"{os.path.basename(store_dir)}.", suffix='.tmp', dir=parent)
+        try:
+            np.save(os.path.join(tmp_dir, 'starts.npy'), np.frombuffer(self.starts, dtype=np.float32))
+            np.save(os.path.join(tmp_dir, 'ends.npy'), np.frombuffer(self.ends, dtype=np.float32))
+            np.save(os.path.join(tmp_dir, 'offsets.npy'), np.frombuffer(self.offsets, dtype=np.uint32))
+            with open(os.path.join(tmp_dir, 'text.bin'), 'wb') as f:
+                f.write(self.text)
+
+            shutil.rmtree(store_dir, ignore_errors=True)
+            os.replace(tmp_dir, store_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return len(self)
+
+
+def write_words(words, store_dir):
+    """
+    Write (start, end, text) tuples to a word store.
+    Words are consumed as an iterator, so the full list never has to be
+    held as Python objects; the store is swapped in atomically.
+    """
+    writer = WordStoreWriter()
+    for start, end, word in words:
+        writer.add(start, end, word)
+    return writer.save(store_dir)
+
+
+def segment_words(segments):
+    """Yield (start, end, text) for every word of Whisper segments transcribed with word timestamps"""
+    for segment in segments:
+        for word in segment.words or []:
+            yield word.start, word.end, word.word
+
+
+def has_words(store_dir):
+    """Check whether a complete word store exists"""
+    return all(os.path.exists(os.path.join(store_dir, name)) for name in STORE_FILES)
+
+
+class WordTimeline:
+    """Read-only view over a word store, memory-mapped from disk."""
+
+    def __init__(self, store_dir):
+        import numpy as np
+
+        self._np = np
+        self.starts = np.load(os.path.join(store_dir, 'starts.npy'), mmap_mode='r')
+        self.ends = np.load(os.path.join(store_dir, 'ends.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(store_dir, 'offsets.npy'), mmap_mode='r')
+        text_path = os.path.join(store_dir, 'text.bin')
+        # np.memmap can't map an empty file
+        if os.path.getsize(text_path):
+            self.text = np.memmap(text_path, dtype=np.uint8, mode='r')
+        else:
+            self.text = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word(self, i):
+        """Get the text of word i"""
+        return bytes(self.text[self.offsets[i]:self.offsets[i + 1]]).decode('utf-8')
+
+    def between(self, start=None, end=None):
+        """
+        Get the words overlapping [start, end) as a list of
+        {'start', 'end', 'text'} dictionaries.
+        """
+        lo = 0 if start is None else int(self._np.searchsorted(self.starts, start, side='left'))
+        hi = len(self) if end is None else int(self._np.searchsorted(self.starts, end, side='left'))
+        # Include a word that began before the range but is still being spoken
+        if start is not None and lo > 0 and self.ends[lo - 1] > start:
+            lo -= 1
+        return [
+            {'start': float(self.starts[i]), 'end': float(self.ends[i]), 'text': self.word(i)}
+            for i in range(lo, hi)
+        ]
@@ -0,0 +1,228 @@
+"""
+Movie Shorts - Media Worker
+Standalone worker that pulls media jobs (transcribe, cut, render,
+boundaries) from the shared job queue and writes results to shared storage.
+
+Run one or more per box with `python worker.py` from the backend folder;
+point MOVIE_SHORTS_STORAGE (and optionally MOVIE_SHORTS_QUEUE_DB) at the
+same shared storage the web nodes use. Without separate workers the web
+app runs one in a background thread (see MOVIE_SHORTS_INPROCESS_WORKER). With --metrics-port the worker
+serves its encode, transcription and stage metrics on /metrics, like the
+web app does.
+"""
+
+import os
+import uuid
+import socket
+import logging
+import argparse
+import threading
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from app.config import storage_folders, queue_path
+from app.services.job_queue import JobQueue, JOB_KINDS
+from app.services.media_service import MediaService
+from app.services.subtitle_service import TranscriptionOptions
+from app.utils.metrics import REGISTRY
+
+# Load environment variables
+load_dotenv()
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JobError(Exception):
+    """A job failed in a way retrying won't fix (bad payload, missing file)."""
+
+
+class Worker:
+    """
+    Claims jobs from a JobQueue and runs them.
+    While a job runs, a background thread renews its lease every third of
+    the lease period, so other workers only take over if this one dies.
+    """
+
+    def __init__(self, queue, folders, worker_id=None, kinds=None, lease_seconds=60, poll_interval=2.0):
+        self.queue = queue
+        self.media = MediaService(folders)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.kinds = kinds or JOB_KINDS
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self.handlers = {
+            'transcribe': self.run_transcribe,
+            'cut': self.run_cut,
+            'render': self.run_render,
+            'boundaries': self.run_boundaries,
+        }
+
+    def _run_media(self, fn, *args):
+        # Missing files and bad parameters won't get better on retry
+        try:
+            return fn(*args)
+        except (FileNotFoundError, ValueError) as e:
+            raise JobError(str(e))
+
+    def run_transcribe(self, payload):
+        """Transcribe a video to SRT using the given transcription options"""
+        try:
+            options = TranscriptionOptions.from_args(payload.get('options', {}))
+        except ValueError as e:
+            raise JobError(f"Invalid transcription options: {str(e)}")
+        # Refinements of a preview transcript also remove the preview
+        transcribe = self.media.refine_transcript if payload.get('refine') else self.media.transcribe
+        srt_path, metadata = self._run_media(transcribe, payload.get('filename'), options)
+        return {'subtitle_filename': os.path.basename(srt_path), 'language': metadata['language']}
+
+    def run_cut(self, payload):
+        """Cut one time range out of a video"""
+        cut_filename = self._run_media(self.media.cut, payload.get('filename'),
+                                       float(payload.get('startTime', 0)), float(payload.get('endTime', 0)),
+                                       payload.get('profile'))
+        return {'cut_filename': cut_filename}
+
+    def run_render(self, payload):
+        """Cut every section of a video (e.g. the AI suggestions) in one job"""
+        sections = payload.get('sections') or []
+        if not sections:
+            raise JobError('No sections provided')
+        cut_filenames = [
+            self._run_media(self.media.cut, payload.get('filename'),
+                            float(section['start']), float(section['end']), payload.get('profile'))
+            for section in sections
+        ]
+        return {'cut_filenames': cut_filenames}
+
+    def run_boundaries(self, payload):
+        """Detect the silences and scene changes that analysis snaps sections to"""
+        silences, scenes = self._run_media(self.media.detect_boundaries, payload.get('filename'))
+        return {'silences': len(silences) // 2, 'scenes': len(scenes)}
+
+    def _heartbeat(self, job_id, done):
+        while not done.wait(self.lease_seconds / 3):
+            try:
+                renewed = self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds)
+            except Exception as e:
+                # e.g. a locked database on shared storage; the lease still has
+                # two beats left, so keep trying rather than let it lapse
+                logger.warning(f"Heartbeat for job {job_id} failed: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost lease on job {job_id}; its result will be discarded")
+                return
+
+    def run_job(self, job):
+        """Run one claimed job and record its outcome"""
+        logger.info(f"Worker {self.worker_id} running {job['kind']} job {job['id']} (attempt {job['attempts']})")
+        done = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job['id'], done), daemon=True)
+        heartbeat.start()
+        try:
+            result = self.handlers[job['kind']](job['payload'])
+            if self.queue.complete(job['id'], self.worker_id, result):
+                logger.info(f"Job {job['id']} completed")
+        except JobError as e:
+            logger.error(f"Job {job['id']} failed: {str(e)}")
+            self.queue.fail(job['id'], self.worker_id, str(e), retry=False)
+        except Exception as e:
+            logger.error(f"Job {job['id']} failed: {str(e)}")
+            logger.error(traceback.format_exc())
+            self.queue.fail(job['id'], self.worker_id, str(e))
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def run_once(self):
+        """Claim and run a single job; returns False if the queue was empty"""
+        job = self.queue.claim(self.worker_id, self.kinds, self.lease_seconds)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def run_forever(self):
+        logger.info(f"Worker {self.worker_id} polling {self.queue.db_path} for {', '.join(self.kinds)} jobs")
+        while not self._stop.is_set():
+            try:
+                if not self.run_once():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                # Keep polling through transient errors such as a locked database
+                logger.error(f"Worker loop error: {str(e)}")
+                self._stop.wait(self.poll_interval)
+
+    def stop(self):
+        self._stop.set()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves the worker's metrics registry on /metrics."""
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the worker log
+        pass
+
+
+def serve_metrics(port, host='0.0.0.0'):
+    """Serve /metrics from a background thread; returns the server"""
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Serving worker metrics on {host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def start_in_process_worker(app, kinds, poll_interval=2.0):
+    """
+    Run a Worker for the given job kinds in a daemon thread of the web
+    process, sharing the app's queue and storage; returns the worker
+    """
+    unknown = set(kinds) - set(JOB_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown job kinds: {', '.join(sorted(unknown))}")
+    worker = Worker(app.extensions['media_service'].queue, app.config, kinds=kinds, poll_interval=poll_interval)
+    threading.Thread(target=worker.run_forever, name='in-process-worker', daemon=True).start()
+    return worker
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run a Movie Shorts media worker.')
+    parser.add_argument('--kinds', default=','.join(JOB_KINDS),
+                        help='Comma-separated job kinds to handle (default: all)')
+    parser.add_argument('--lease', type=float, default=60, help='Lease length in seconds')
+    parser.add_argument('--poll-interval', type=float, default=2.0, help='Seconds between polls when idle')
+    parser.add_argument('--worker-id', help='Identifier recorded on claimed jobs')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on this port')
+    args = parser.parse_args(argv)
+
+    kinds = [kind.strip() for kind in args.kinds.split(',') if kind.strip()]
+    unknown = set(kinds) - set(JOB_KINDS)
+    if unknown:
+        parser.error(f"Unknown job kinds: {', '.join(sorted(unknown))}")
+
+    if args.metrics_port is not None:
+        serve_metrics(args.metrics_port)
+    worker = Worker(JobQueue(queue_path()), storage_folders(), args.worker_id, kinds,
+                    args.lease, args.poll_interval)
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
+
+if __name__ == '__main__':
+    main()
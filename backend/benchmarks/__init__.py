@@ -0,0 +1,6 @@
+"""
+Movie Shorts Benchmarks
+Reproducible, offline benchmarks for the media pipeline.
+
+Run from the backend directory with ``python -m benchmarks.run_benchmarks``.
+"""
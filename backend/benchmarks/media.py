@@ -0,0 +1,96 @@
+"""
+Benchmark Media Module
+Synthesizes test media locally with ffmpeg's lavfi sources, so benchmarks
+never depend on downloaded fixtures.
+"""
+
+import os
+import subprocess
+from collections import namedtuple
+
+# One synthetic input: container/codec, resolution, length and whether an
+# SRT track is muxed in alongside the video and audio streams
+MediaSpec = namedtuple('MediaSpec', 'name duration width height fps container video_codec audio_codec subtitle_codec')
+
+# Per-container codec choices for the embedded subtitle track
+SUBTITLE_CODECS = {'mp4': 'mov_text', 'mkv': 'srt', 'webm': 'webvtt'}
+
+# Quick matrix used by default; covers each container, codec and the
+# with/without subtitle case at small sizes
+QUICK_MATRIX = [
+    MediaSpec('h264_360p_10s', 10, 640, 360, 25, 'mp4', 'libx264', 'aac', None),
+    MediaSpec('h264_360p_10s_subs', 10, 640, 360, 25, 'mp4', 'libx264', 'aac', 'mov_text'),
+    MediaSpec('h264_720p_30s_subs', 30, 1280, 720, 25, 'mkv', 'libx264', 'aac', 'srt'),
+    MediaSpec('vp9_360p_10s', 10, 640, 360, 25, 'webm', 'libvpx-vp9', 'libopus', None),
+]
+
+# Full matrix adds longer and higher-resolution sources
+FULL_MATRIX = QUICK_MATRIX + [
+    MediaSpec('h264_1080p_60s', 60, 1920, 1080, 30, 'mp4', 'libx264', 'aac', None),
+    MediaSpec('h264_1080p_120s_subs', 120, 1920, 1080, 25, 'mkv', 'libx264', 'aac', 'srt'),
+    MediaSpec('hevc_720p_60s', 60, 1280, 720, 25, 'mp4', 'libx265', 'aac', None),
+    MediaSpec('vp9_720p_60s_subs', 60, 1280, 720, 25, 'webm', 'libvpx-vp9', 'libopus', 'webvtt'),
+]
+
+MATRICES = {'quick': QUICK_MATRIX, 'full': FULL_MATRIX}
+
+# Long 4K source for the concurrent memory stress test (app/tests/test_memory_stress.py)
+STRESS_SPEC = MediaSpec('h264_2160p_600s_subs', 600, 3840, 2160, 25, 'mkv', 'libx264', 'aac', 'srt')
+
+
+def write_test_srt(output_path, duration, cue_length=2.0, gap=0.5):
+    """Write an SRT file with evenly spaced numbered cues covering duration"""
+    from app.utils.video_utils import format_timestamp
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        index, start = 1, 0.0
+        while start + cue_length <= duration:
+            end = start + cue_length
+            f.write(f"{index}\n{format_timestamp(start)} --> {format_timestamp(end)}\n"
+                    f"Benchmark cue number {index}\n\n")
+            index += 1
+            start = end + gap
+    return output_path
+
+
+def synthesize(spec, workdir):
+    """
+    Create the media file described by spec inside workdir.
+    Files are reused when they already exist, so repeated runs only pay
+    the generation cost once.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    output_path = os.path.join(workdir, f"{spec.name}.{spec.container}")
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        return output_path
+
+    cmd = [
+        'ffmpeg', '-y', '-v', 'error',
+        '-f', 'lavfi', '-i', f"testsrc=duration={spec.duration}:size={spec.width}x{spec.height}:rate={spec.fps}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={spec.duration}",
+    ]
+    if spec.subtitle_codec:
+        srt_path = write_test_srt(os.path.join(workdir, f"{spec.name}.srt"), spec.duration)
+        cmd += ['-i', srt_path]
+    cmd += ['-map', '0:v', '-map', '1:a']
+    if spec.subtitle_codec:
+        cmd += ['-map', '2:s', '-c:s', spec.subtitle_codec, '-metadata:s:s:0', 'language=eng']
+    cmd += ['-c:v', spec.video_codec, '-pix_fmt', 'yuv420p', '-c:a', spec.audio_codec]
+    if spec.video_codec == 'libvpx-vp9':
+        # Realtime deadline keeps VP9 generation from dominating setup time
+        cmd += ['-deadline', 'realtime', '-cpu-used', '8']
+    else:
+        cmd += ['-preset', 'ultrafast']
+    cmd += ['-shortest', output_path]
+
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return output_path
+
+
+def ffmpeg_version():
+    """Return the first line of `ffmpeg -version`, or None if ffmpeg is missing"""
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+        return result.stdout.splitlines()[0] if result.stdout else None
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,300 @@
+"""
+Benchmark Runner
+Measures the media pipeline on synthetic inputs and writes the results as
+JSON so runs can be compared across commits.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks [--matrix quick|full] [--repeat N]
+        [--whisper-model tiny] [--output results.json] [--compare old.json]
+
+Everything runs offline on CPU: media is generated with ffmpeg and the
+Whisper model is only loaded from the local cache (or a local path).
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from .media import MATRICES, ffmpeg_version, synthesize
+from app.utils.encoder_profiles import ENCODER_PROFILES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MEDIA_DIR = os.path.join(BACKEND_DIR, 'benchmarks', '.media')
+DEFAULT_RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+
+# Cut modes exercised by the cut benchmark; each entry is the extra JSON
+# sent with the /cut request
+CUT_MODES = {profile: {'profile': profile} for profile in ENCODER_PROFILES}
+
+# Stand-in for Whisper segments when benchmarking SRT writing
+FakeSegment = namedtuple('FakeSegment', 'start end text')
+
+
+def measure(fn, repeat):
+    """
+    Call fn repeat times and summarize its wall time.
+    fn may return a dict of extra values, which is kept from the last run.
+    """
+    timings = []
+    extra = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extra = fn() or {}
+        timings.append(time.perf_counter() - start)
+    return {
+        'runs': repeat,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.fmean(timings),
+        **extra,
+    }
+
+
+def run_case(results, name, fn, repeat, media=None):
+    """Run one benchmark case and append its result (or failure) to results"""
+    entry = {'name': name, 'media': media}
+    try:
+        entry.update(measure(fn, repeat))
+        logger.info(f"{name} [{media or '-'}]: median {entry['median'] * 1000:.1f} ms")
+    except Exception as e:
+        entry['error'] = str(e)
+        logger.warning(f"{name} [{media or '-'}] failed: {e}")
+    results.append(entry)
+
+
+def bench_import_time(results, budget):
+    """Time a cold `import app.app` in a fresh interpreter"""
+    code = "import time; t = time.perf_counter(); import app.app; print(time.perf_counter() - t)"
+
+    def run():
+        output = subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True)
+        seconds = float(output.stdout.strip().splitlines()[-1])
+        return {'import_seconds': seconds}
+
+    run_case(results, 'import_app', run, repeat=3)
+    entry = results[-1]
+    entry['budget'] = budget
+    entry['within_budget'] = entry.get('import_seconds', float('inf')) <= budget
+    return entry['within_budget']
+
+
+def bench_srt(results, repeat, workdir):
+    """Write and parse SRT files of increasing size"""
+    from app.utils.video_utils import generate_srt, parse_srt
+
+    for cue_count in (1000, 10000):
+        segments = [FakeSegment(i * 2.5, i * 2.5 + 2.0, f" Benchmark subtitle line {i} ") for i in range(cue_count)]
+        srt_path = os.path.join(workdir, f"bench_{cue_count}.srt")
+        run_case(results, f'srt_write_{cue_count}', lambda: generate_srt(segments, srt_path), repeat)
+        run_case(results, f'srt_parse_{cue_count}', lambda: {'cues': len(parse_srt(srt_path))}, repeat)
+
+
+def bench_media(results, app, spec, media_path, repeat, workdir):
+    """Upload, probe, extract subtitles and boundaries from and cut one synthetic file"""
+    from app.utils import video_utils
+    from app.utils.video_utils import get_video_info, check_subtitles, extract_subtitles
+    from app.utils.boundary_utils import detect_boundaries
+
+    client = app.test_client()
+    filename = os.path.basename(media_path)
+    size = os.path.getsize(media_path)
+    uploaded_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+
+    def upload():
+        with open(media_path, 'rb') as f:
+            response = client.post('/upload', data={'video': (f, filename)}, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(response.get_json().get('error'))
+        return {'bytes': size, 'server_timing': response.headers.get('Server-Timing')}
+
+    # ffprobe results are cached per file; clear the cache so every repeat runs ffprobe
+    def probe_video_info():
+        video_utils._probe_media.cache_clear()
+        get_video_info(media_path)
+
+    def probe_subtitles():
+        video_utils._probe_media.cache_clear()
+        return {'has_subtitles': check_subtitles(media_path)}
+
+    def extract():
+        subtitles_dir = tempfile.mkdtemp(dir=workdir)
+        try:
+            return {'found': extract_subtitles(media_path, filename, subtitles_dir) is not None}
+        finally:
+            shutil.rmtree(subtitles_dir, ignore_errors=True)
+
+    run_case(results, 'upload', upload, repeat, spec.name)
+    run_case(results, 'probe_video_info', probe_video_info, repeat, spec.name)
+    run_case(results, 'probe_subtitles', probe_subtitles, repeat, spec.name)
+    run_case(results, 'subtitle_extract', extract, repeat, spec.name)
+    run_case(results, 'boundary_detect', lambda: dict(zip(('silences', 'scenes'), map(len, detect_boundaries(media_path)))),
+             repeat, spec.name)
+
+    if not os.path.exists(uploaded_path):
+        shutil.copyfile(media_path, uploaded_path)
+    cut_length = min(5.0, spec.duration / 2)
+    for mode, options in CUT_MODES.items():
+        def cut():
+            payload = {'filename': filename, 'startTime': 1.0, 'endTime': 1.0 + cut_length, **options}
+            response = client.post('/cut', json=payload)
+            body = response.get_json()
+            if response.status_code != 200:
+                raise RuntimeError(body.get('error'))
+            cut_path = os.path.join(app.config['CUTS_FOLDER'], body['cut_filename'])
+            output_bytes = os.path.getsize(cut_path)
+            os.remove(cut_path)
+            return {'cut_seconds': cut_length, 'output_bytes': output_bytes}
+
+        run_case(results, f'cut_{mode}', cut, repeat, spec.name)
+
+    if os.path.exists(uploaded_path):
+        os.remove(uploaded_path)
+
+
+def bench_transcription(results, model_name, media_path, media_name, repeat):
+    """Transcribe one file with a small local Whisper model, with and without VAD and word timings"""
+    from app.services.subtitle_service import SubtitleService, TranscriptionOptions
+
+    service = SubtitleService(model_size=model_name)
+
+    def load():
+        service.model
+        return {'model': model_name}
+
+    run_case(results, 'whisper_load', load, 1)
+    if 'error' in results[-1]:
+        return
+
+    variants = {
+        'whisper_transcribe': TranscriptionOptions(),
+        'whisper_transcribe_vad': TranscriptionOptions(vad_filter=True),
+        'whisper_transcribe_words': TranscriptionOptions(word_timestamps=True),
+    }
+    for name, options in variants.items():
+        def transcribe():
+            start = time.perf_counter()
+            with service.transcribe(media_path, options) as (segments, info):
+                segment_count = sum(1 for _ in segments)
+            elapsed = time.perf_counter() - start
+            return {'segments': segment_count, 'audio_seconds': info.duration,
+                    'realtime_factor': info.duration / elapsed if elapsed else None}
+
+        run_case(results, name, transcribe, repeat, media_name)
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BACKEND_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def compare(current, baseline_path):
+    """Print the median change of each case relative to an earlier results file"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['name'], r['media']): r for r in baseline['results'] if 'median' in r}
+    for entry in current['results']:
+        old = previous.get((entry['name'], entry['media']))
+        if old is None or 'median' not in entry:
+            continue
+        change = (entry['median'] - old['median']) / old['median'] * 100 if old['median'] else 0.0
+        print(f"{entry['name']:<24} {entry['media'] or '-':<24} "
+              f"{old['median'] * 1000:>10.1f} ms -> {entry['median'] * 1000:>10.1f} ms ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the Movie Shorts media pipeline.')
+    parser.add_argument('--matrix', choices=sorted(MATRICES), default='quick')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--media-dir', default=DEFAULT_MEDIA_DIR)
+    parser.add_argument('--whisper-model', default='tiny',
+                        help="Whisper model name or local model directory; '' skips transcription")
+    parser.add_argument('--import-budget', type=float, default=1.0,
+                        help='Maximum seconds allowed for a cold `import app.app`')
+    parser.add_argument('--output', help='Results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if ffmpeg_version() is None:
+        parser.error('ffmpeg is required to synthesize benchmark media')
+
+    # Never reach out to the network for model weights
+    os.environ.setdefault('HF_HUB_OFFLINE', '1')
+    sys.path.insert(0, BACKEND_DIR)
+
+    # Keep uploads, cuts, analysis artifacts and the job queue out of the
+    # real storage; app.config reads these when it is first imported
+    workdir = tempfile.mkdtemp(prefix='movie-shorts-bench-')
+    os.environ['MOVIE_SHORTS_STORAGE'] = os.path.join(workdir, 'storage')
+    os.environ['MOVIE_SHORTS_QUEUE_DB'] = os.path.join(workdir, 'storage', 'queue.sqlite3')
+    if 'app.config' in sys.modules:
+        raise RuntimeError('app.config was imported before the benchmark storage was set')
+
+    results = []
+    import_ok = bench_import_time(results, args.import_budget)
+
+    from app.app import create_app
+    app = create_app()
+    specs = MATRICES[args.matrix]
+    try:
+        bench_srt(results, args.repeat, workdir)
+        media_paths = {}
+        for spec in specs:
+            media_paths[spec.name] = synthesize(spec, args.media_dir)
+            bench_media(results, app, spec, media_paths[spec.name], args.repeat, workdir)
+        if args.whisper_model:
+            shortest = min(specs, key=lambda spec: spec.duration)
+            bench_transcription(results, args.whisper_model, media_paths[shortest.name], shortest.name, args.repeat)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'matrix': args.matrix,
+            'repeat': args.repeat,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'ffmpeg': ffmpeg_version(),
+            'media': [spec._asdict() for spec in specs],
+        },
+        'results': results,
+    }
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Wrote benchmark results to {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+    if not import_ok:
+        logger.error(f"Importing app.app exceeded the {args.import_budget}s budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())